@@ -0,0 +1,39 @@
+#!/usr/bin/env node
+// Resident ESLint worker for PatchPilot (see linter_workers.py).
+// Reads {"id", "path"} requests as NDJSON on stdin and answers each with
+// {"id", "result"} where result matches `eslint --format=json` output.
+
+const readline = require('readline');
+
+let eslint;
+try {
+  const { ESLint } = require('eslint');
+  eslint = new ESLint();
+} catch (err) {
+  process.stderr.write(`Failed to load eslint: ${err.message}\n`);
+  process.exit(1);
+}
+
+const send = (response) => {
+  process.stdout.write(JSON.stringify(response) + '\n');
+};
+
+const rl = readline.createInterface({ input: process.stdin });
+
+rl.on('line', async (line) => {
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch {
+    return;
+  }
+
+  try {
+    const results = await eslint.lintFiles([request.path]);
+    send({ id: request.id, result: results });
+  } catch (err) {
+    send({ id: request.id, error: err.message });
+  }
+});
+
+rl.on('close', () => process.exit(0));
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Persistent linter workers for PatchPilot
+Keeps pylint (through its Python API) and ESLint (in a resident Node
+process) loaded between files so each lint request skips the cold start
+"""
+
+import atexit
+import importlib.util
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import queue
+from typing import Dict, List, Optional
+
+ESLINT_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eslint_server.cjs")
+
+
+def node_env() -> Dict[str, str]:
+    """Environment that lets Node processes resolve globally installed packages"""
+    env = dict(os.environ)
+    npm = shutil.which("npm")
+    if npm:
+        try:
+            result = subprocess.run([npm, "root", "-g"], capture_output=True, text=True, timeout=10)
+            global_root = result.stdout.strip()
+            if global_root:
+                paths = [p for p in (env.get("NODE_PATH"), global_root) if p]
+                env["NODE_PATH"] = os.pathsep.join(paths)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+    return env
+
+
+class WorkerError(Exception):
+    """Raised when a worker cannot answer a request"""
+
+
+class WorkerCrashed(WorkerError):
+    """Raised when the worker process died before answering"""
+
+
+class WorkerTimeout(WorkerError):
+    """Raised when the worker did not answer in time; the worker is killed"""
+
+
+class LinterWorker:
+    """A long-lived linter process speaking NDJSON over its stdin/stdout
+
+    Requests carry an id and the response with the same id is returned.
+    The process is restarted after it crashes, after max_requests requests
+    or once its resident memory grows past max_rss_mb, and a request that
+    runs past its timeout kills the process.
+    """
+
+    def __init__(self, name: str, command: List[str], timeout: float = 30,
+                 max_requests: int = 500, max_rss_mb: int = 512,
+                 max_failures: int = 3, env: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.command = command
+        self.timeout = timeout
+        self.max_requests = max_requests
+        self.max_rss_mb = max_rss_mb
+        self.max_failures = max_failures
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+        self.disabled = False
+        self._responses: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._served = 0
+        self._failures = 0
+
+    def start(self):
+        self._responses = queue.Queue()
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            env=self.env,
+        )
+        self._served = 0
+        reader = threading.Thread(
+            target=self._read_responses,
+            args=(self.process.stdout, self._responses),
+            daemon=True,
+        )
+        reader.start()
+
+    @staticmethod
+    def _read_responses(stream, responses: "queue.Queue[Optional[Dict]]"):
+        for line in stream:
+            try:
+                responses.put(json.loads(line))
+            except ValueError:
+                continue
+        # EOF: the worker exited
+        responses.put(None)
+
+    def stop(self):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def kill(self):
+        """Kill the worker immediately; safe to call from another thread"""
+        process, self.process = self.process, None
+        if process is not None:
+            process.kill()
+            process.wait()
+
+    def rss_mb(self) -> Optional[float]:
+        """Resident memory of the worker, where /proc is available"""
+        if self.process is None:
+            return None
+        try:
+            with open(f"/proc/{self.process.pid}/statm") as f:
+                pages = int(f.read().split()[1])
+            return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        except (OSError, ValueError, IndexError, AttributeError):
+            return None
+
+    def request(self, payload: Dict, timeout: Optional[float] = None) -> Dict:
+        """Send one request, restarting the worker once if it has crashed"""
+        with self._lock:
+            if self.disabled:
+                raise WorkerError(f"{self.name} worker is disabled")
+            if timeout is None:
+                timeout = self.timeout
+            try:
+                return self._request(payload, timeout)
+            except WorkerCrashed:
+                if self.disabled:
+                    raise
+            return self._request(payload, timeout)
+
+    def _request(self, payload: Dict, timeout: float) -> Dict:
+        if self.process is None or self.process.poll() is not None:
+            self.stop()
+            self.start()
+
+        self._next_id += 1
+        request_id = self._next_id
+        try:
+            self.process.stdin.write(json.dumps(dict(payload, id=request_id)) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            self._record_failure()
+            raise WorkerCrashed(f"{self.name} worker is not accepting requests")
+
+        while True:
+            try:
+                response = self._responses.get(timeout=timeout)
+            except queue.Empty:
+                self.kill()
+                raise WorkerTimeout(f"{self.name} worker timed out after {timeout}s")
+            if response is None:
+                if self.process is None:
+                    # Killed on purpose (cancellation), not a crash worth retrying
+                    raise WorkerError(f"{self.name} worker was stopped")
+                self._record_failure()
+                raise WorkerCrashed(f"{self.name} worker exited")
+            if response.get("id") == request_id:
+                break
+            # Stale response from a request that timed out earlier
+
+        self._failures = 0
+        self._served += 1
+        rss = self.rss_mb()
+        if self._served >= self.max_requests or (rss is not None and rss > self.max_rss_mb):
+            self.stop()
+
+        if "error" in response:
+            raise WorkerError(f"{self.name}: {response['error']}")
+        return response
+
+    def _record_failure(self):
+        self.stop()
+        self._failures += 1
+        if self._failures >= self.max_failures:
+            self.disabled = True
+
+
+class LinterWorkers:
+    """Lazily started pylint and eslint workers shared by a processor"""
+
+    def __init__(self, timeout: float = 30):
+        self.timeout = timeout
+        self._workers: Dict[str, Optional[LinterWorker]] = {}
+        atexit.register(self.shutdown)
+
+    def get(self, linter: str) -> Optional[LinterWorker]:
+        if linter not in self._workers:
+            self._workers[linter] = self._create(linter)
+        worker = self._workers[linter]
+        if worker is None or worker.disabled:
+            return None
+        return worker
+
+    def _create(self, linter: str) -> Optional[LinterWorker]:
+        if linter == "pylint":
+            if importlib.util.find_spec("pylint") is None:
+                return None
+            return LinterWorker(
+                "pylint",
+                [sys.executable, os.path.abspath(__file__), "pylint"],
+                timeout=self.timeout,
+            )
+        if linter == "eslint":
+            node = shutil.which("node")
+            if not node or not os.path.exists(ESLINT_SERVER):
+                return None
+            return LinterWorker("eslint", [node, ESLINT_SERVER], timeout=self.timeout, env=node_env())
+        return None
+
+    def lint(self, linter: str, filepath: str, timeout: Optional[float] = None):
+        """Lint a file and return the linter's JSON report
+
+        The report matches the CLI's --output-format=json / --format=json
+        output. Raises WorkerTimeout when the file took too long and
+        WorkerError when no warm worker can serve it.
+        """
+        worker = self.get(linter)
+        if worker is None:
+            raise WorkerError(f"No {linter} worker available")
+        return worker.request({"path": filepath}, timeout)["result"]
+
+    def shutdown(self):
+        for worker in self._workers.values():
+            if worker is not None:
+                worker.stop()
+
+
+def serve_pylint():
+    """Worker loop: lint files with pylint's Python API, one request per line"""
+    from pylint.lint import Run
+    from pylint.reporters import JSONReporter
+
+    protocol = sys.stdout
+    # Anything pylint or plugins print must not corrupt the protocol stream
+    sys.stdout = sys.stderr
+
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            continue
+        response = {"id": request.get("id")}
+        try:
+            output = io.StringIO()
+            Run(
+                [request["path"], "--disable=C0103,C0114,C0115,C0116"],
+                reporter=JSONReporter(output),
+                exit=False,
+            )
+            report = output.getvalue()
+            response["result"] = json.loads(report) if report.strip() else []
+        except Exception as e:
+            response["error"] = str(e)
+        protocol.write(json.dumps(response) + "\n")
+        protocol.flush()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "pylint":
+        serve_pylint()
+    else:
+        print("Usage: python linter_workers.py pylint", file=sys.stderr)
+        sys.exit(1)
@@ -6,17 +6,25 @@ Handles single files, directories, and provides real-time progress feedback
 
 import subprocess
 import json
+import struct
 import sys
 import os
 import tempfile
 import time
 import shutil
+import signal
 from pathlib import Path
 import difflib
-from typing import Dict, List, Tuple, Optional
+import hashlib
+from typing import BinaryIO, Callable, Dict, Iterator, List, Tuple, Optional
 import threading
 import queue
 
+from linter_workers import LinterWorkers, WorkerError, WorkerTimeout
+from records import IssueTable, encode_compact, to_jsonable
+from sandbox_pool import SandboxPool, SandboxUnavailable
+from watcher import SKIP_DIRS, DirectoryWatcher
+
 class ProgressTracker:
     def __init__(self):
         self.current_step = "reading"
@@ -39,6 +47,104 @@ class ProgressTracker:
         # In a real implementation, this would send to frontend
         print(f"PROGRESS: {json.dumps(progress_data)}", file=sys.stderr)
 
+class AnalysisCancelled(Exception):
+    """Raised inside a stage when its cancellation token has fired"""
+
+class CancellationToken:
+    """Cooperative cancellation with an optional overall deadline
+
+    Stages check the token between steps, cap their own timeouts at the
+    remaining time, and register callbacks so cancel() can terminate
+    in-flight subprocesses immediately.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.reason: Optional[str] = None
+        self._callbacks: List[Callable[[], None]] = []
+        # Reentrant: cancel() runs from signal handlers, which can interrupt
+        # the main thread while it holds the lock in on_cancel() or remove()
+        self._lock = threading.RLock()
+
+    @property
+    def cancelled(self) -> bool:
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.reason = "Deadline exceeded"
+        return self.reason is not None
+
+    def cancel(self, reason: str = "Analysis cancelled"):
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Cancel callback failed: {e}", file=sys.stderr)
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0)
+
+    def timeout(self, limit: Optional[float]) -> Optional[float]:
+        """A stage's own timeout capped at the time left before the deadline"""
+        remaining = self.remaining()
+        if remaining is None:
+            return limit
+        return remaining if limit is None else min(limit, remaining)
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise AnalysisCancelled(self.reason)
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback for cancel(); returns a function that unregisters it"""
+        with self._lock:
+            self._callbacks.append(callback)
+        if self.reason is not None:
+            callback()
+
+        def remove():
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+        return remove
+
+def run_process(cmd: List[str], timeout: Optional[float] = None,
+                cancel_token: Optional[CancellationToken] = None,
+                input: Optional[bytes] = None, text: bool = False, **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run with capture_output that also stops when the token is cancelled
+
+    Raises subprocess.TimeoutExpired when the stage's own timeout runs out
+    and AnalysisCancelled when the token was cancelled or its deadline hit.
+    """
+    token = cancel_token or CancellationToken()
+    token.raise_if_cancelled()
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if input is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=text,
+        **kwargs,
+    )
+    remove = token.on_cancel(process.kill)
+    try:
+        stdout, stderr = process.communicate(input, timeout=token.timeout(timeout))
+    except subprocess.TimeoutExpired as e:
+        process.kill()
+        e.output, e.stderr = process.communicate()
+        token.raise_if_cancelled()
+        raise
+    finally:
+        remove()
+    if token.reason is not None:
+        # Killed by cancel() rather than finishing on its own
+        raise AnalysisCancelled(token.reason)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
 class EnhancedCodeProcessor:
     def __init__(self):
         self.supported_languages = {
@@ -69,23 +175,39 @@ class EnhancedCodeProcessor:
         }
         
         self.progress_tracker = ProgressTracker()
+        # Linter availability is probed once per process and shared by batches
+        self._tool_availability: Dict[str, bool] = {}
+        # Per-file linter timeout in seconds, for warm workers and CLI runs alike
+        self.lint_timeout = 30
+        # Warm pylint/eslint processes, started on first use
+        self.linter_workers = LinterWorkers(timeout=self.lint_timeout)
+        # Pre-started interpreters for run_code_sandbox
+        self.sandbox_pool = SandboxPool()
 
     def detect_language(self, filename: str, content: str) -> str:
         """Detect programming language from filename and content"""
         extension = Path(filename).suffix.lower().lstrip('.')
         return self.supported_languages.get(extension, 'text')
 
-    def analyze_directory(self, directory_path: str) -> Dict:
-        """Analyze an entire directory of code files"""
-        self.progress_tracker.update("reading", 0, "Scanning directory...")
-        
+    def is_code_file(self, path: str) -> bool:
+        """Whether a path is a supported source file outside skipped directories"""
+        filename = os.path.basename(path)
+        if filename.startswith('.'):
+            return False
+        parts = Path(path).parts[:-1]
+        if any(part in SKIP_DIRS for part in parts):
+            return False
+        return Path(filename).suffix.lower().lstrip('.') in self.supported_languages
+
+    def scan_directory(self, directory_path: str) -> List[Dict]:
+        """Find all supported code files under a directory"""
         code_files = []
         supported_extensions = set(self.supported_languages.keys())
         
         # Recursively find all code files
         for root, dirs, files in os.walk(directory_path):
             # Skip common non-code directories
-            dirs[:] = [d for d in dirs if d not in {'.git', '__pycache__', 'node_modules', '.vscode', '.idea'}]
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
             
             for file in files:
                 if file.startswith('.'):
@@ -101,39 +223,67 @@ class EnhancedCodeProcessor:
                         'filename': file,
                         'extension': extension
                     })
+        return code_files
+
+    def analyze_file(self, file_info: Dict, cancel_token: Optional[CancellationToken] = None) -> Dict:
+        """Read and analyze one file found by scan_directory"""
+        try:
+            with open(file_info['path'], 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+            
+            file_result = self.process_code_with_progress(content, file_info['filename'], cancel_token)
+            file_result['relative_path'] = file_info['relative_path']
+            return file_result
+            
+        except AnalysisCancelled:
+            raise
+        except Exception as e:
+            return {
+                'filename': file_info['filename'],
+                'relative_path': file_info['relative_path'],
+                'error': str(e),
+                'success': False
+            }
+
+    def analyze_directory(self, directory_path: str, cancel_token: Optional[CancellationToken] = None) -> Dict:
+        """Analyze an entire directory of code files
+
+        If cancel_token fires, the files finished so far are returned with
+        'incomplete' set and the rest listed in 'skipped_files'.
+        """
+        token = cancel_token or CancellationToken()
+        self.progress_tracker.update("reading", 0, "Scanning directory...")
+        
+        code_files = self.scan_directory(directory_path)
         
         self.progress_tracker.update("reading", 30, f"Found {len(code_files)} code files")
         
         # Analyze each file
         results = []
+        skipped_files = []
         total_files = len(code_files)
         
         for i, file_info in enumerate(code_files):
+            if token.cancelled:
+                skipped_files = [f['relative_path'] for f in code_files[i:]]
+                break
             progress = 30 + (60 * i / total_files)
             self.progress_tracker.update("analyzing", int(progress), f"Analyzing {file_info['filename']}...")
-            
             try:
-                with open(file_info['path'], 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                
-                file_result = self.process_code(content, file_info['filename'])
-                file_result['relative_path'] = file_info['relative_path']
-                results.append(file_result)
-                
-            except Exception as e:
-                results.append({
-                    'filename': file_info['filename'],
-                    'relative_path': file_info['relative_path'],
-                    'error': str(e),
-                    'success': False
-                })
+                results.append(self.analyze_file(file_info, token))
+            except AnalysisCancelled:
+                skipped_files = [f['relative_path'] for f in code_files[i:]]
+                break
         
         self.progress_tracker.update("generating", 90, "Generating project summary...")
         
         # Generate project-level analysis
         project_analysis = self.generate_project_analysis(results, directory_path)
         
-        self.progress_tracker.update("complete", 100, "Directory analysis complete!")
+        if skipped_files:
+            self.progress_tracker.update("cancelled", 100, f"{token.reason}: {len(results)}/{total_files} files analyzed")
+        else:
+            self.progress_tracker.update("complete", 100, "Directory analysis complete!")
         
         return {
             'type': 'directory',
@@ -141,9 +291,91 @@ class EnhancedCodeProcessor:
             'total_files': total_files,
             'analyzed_files': len([r for r in results if r.get('success', True)]),
             'results': results,
-            'project_analysis': project_analysis
+            'project_analysis': project_analysis,
+            'incomplete': bool(skipped_files),
+            'incomplete_reason': token.reason if skipped_files else None,
+            'skipped_files': skipped_files
         }
 
+    def watch_directory(self, directory_path: str, emit: Callable[[Dict], None],
+                        stop_event: Optional[threading.Event] = None,
+                        debounce: float = 0.3, polling: bool = False,
+                        cancel_token: Optional[CancellationToken] = None):
+        """Analyze a directory, then re-analyze only changed files until stopped
+
+        emit receives the initial directory result followed by "file",
+        "removed" and "summary" updates. Watching ends when stop_event is
+        set or cancel_token fires; cancelling also aborts the analysis in
+        progress.
+        """
+        token = cancel_token or CancellationToken()
+        watcher = DirectoryWatcher(directory_path, debounce=debounce,
+                                   include=lambda path: self.is_code_file(os.path.relpath(path, directory_path)),
+                                   polling=polling)
+        emit({'type': 'watch', 'path': directory_path, 'mode': watcher.mode})
+
+        # Digest before analysing: an edit made during the initial run then
+        # differs from the stored digest and is picked up by the first batch
+        digests = {}
+        for file_info in self.scan_directory(directory_path):
+            digest = self._file_digest(file_info['path'])
+            if digest:
+                digests[file_info['relative_path']] = digest
+
+        initial = self.analyze_directory(directory_path, token)
+        emit(initial)
+        results = {r['relative_path']: r for r in initial['results']}
+
+        for batch in watcher.batches(stop_event):
+            if token.cancelled:
+                return
+            changed = False
+
+            # Deleted or moved-away files, including whole directories
+            for relative_path in list(results):
+                if not os.path.isfile(os.path.join(directory_path, relative_path)):
+                    del results[relative_path]
+                    digests.pop(relative_path, None)
+                    emit({'type': 'removed', 'relative_path': relative_path})
+                    changed = True
+
+            for path in sorted(batch):
+                relative_path = os.path.relpath(path, directory_path)
+                digest = self._file_digest(path)
+                # Skip deleted files and rewrites that left the content unchanged
+                if digest is None or digests.get(relative_path) == digest:
+                    continue
+                digests[relative_path] = digest
+                try:
+                    result = self.analyze_file({
+                        'path': path,
+                        'relative_path': relative_path,
+                        'filename': os.path.basename(path),
+                    }, token)
+                except AnalysisCancelled:
+                    return
+                results[relative_path] = result
+                emit({'type': 'file', 'relative_path': relative_path, 'result': result})
+                changed = True
+
+            if changed:
+                file_results = list(results.values())
+                emit({
+                    'type': 'summary',
+                    'path': directory_path,
+                    'total_files': len(file_results),
+                    'analyzed_files': len([r for r in file_results if r.get('success', True)]),
+                    'project_analysis': self.generate_project_analysis(file_results, directory_path),
+                })
+
+    @staticmethod
+    def _file_digest(path: str) -> Optional[str]:
+        try:
+            with open(path, 'rb') as f:
+                return hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return None
+
     def generate_project_analysis(self, file_results: List[Dict], directory_path: str) -> Dict:
         """Generate high-level project analysis from individual file results"""
         
@@ -244,14 +476,15 @@ class EnhancedCodeProcessor:
             
         return summary
 
-    def run_static_analysis(self, code: str, language: str, filename: str) -> Dict:
+    def run_static_analysis(self, code: str, language: str, filename: str,
+                            cancel_token: Optional[CancellationToken] = None) -> Dict:
         """Run static analysis tools (linting) on the code with progress tracking"""
         self.progress_tracker.update("parsing", 40, f"Running static analysis on {filename}...")
         
-        issues = []
+        issues = IssueTable()
         
         if language not in self.linters:
-            return {"issues": [], "tool": "none", "status": "no_linter"}
+            return {"issues": issues, "tool": "none", "status": "no_linter"}
         
         # Create temporary file for analysis
         with tempfile.NamedTemporaryFile(mode='w', suffix=f'.{language}', delete=False) as tmp:
@@ -261,8 +494,21 @@ class EnhancedCodeProcessor:
         try:
             for linter in self.linters[language]:
                 if self.check_tool_available(linter):
-                    linter_issues = self.run_linter(linter, tmp_path, language)
-                    issues.extend(linter_issues)
+                    try:
+                        issues = self.run_linter(linter, tmp_path, language, cancel_token)
+                    except AnalysisCancelled:
+                        raise
+                    except FileNotFoundError:
+                        # Neither the worker nor the CLI could run it: not installed
+                        self._tool_availability[linter] = False
+                        continue
+                    except (WorkerTimeout, subprocess.TimeoutExpired):
+                        error = f"{linter} timed out after {self.lint_timeout}s"
+                        print(f"Error running {linter}: {error}", file=sys.stderr)
+                        return {"issues": issues, "tool": linter, "status": "timeout", "error": error}
+                    except Exception as e:
+                        print(f"Error running {linter}: {e}", file=sys.stderr)
+                        return {"issues": issues, "tool": linter, "status": "error", "error": str(e)}
                     break  # Use first available linter
             
             return {
@@ -276,52 +522,76 @@ class EnhancedCodeProcessor:
 
     def check_tool_available(self, tool: str) -> bool:
         """Check if a linting tool is available"""
+        if tool in self._tool_availability:
+            return self._tool_availability[tool]
+        if self.linter_workers.get(tool) is not None:
+            # A warm worker serves it, so skip the cold CLI probe; a linter
+            # that turns out to be missing is recorded on first use
+            return True
         try:
             subprocess.run([tool, '--version'], capture_output=True, check=True)
-            return True
+            available = True
         except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+            available = False
+        self._tool_availability[tool] = available
+        return available
 
-    def run_linter(self, linter: str, filepath: str, language: str) -> List[Dict]:
-        """Run specific linter and parse output"""
-        issues = []
-        
-        try:
-            if linter == 'pylint':
-                result = subprocess.run([
-                    'pylint', filepath, '--output-format=json', '--disable=C0103,C0114,C0115,C0116'
-                ], capture_output=True, text=True)
-                
-                if result.stdout:
-                    pylint_issues = json.loads(result.stdout)
-                    for issue in pylint_issues:
-                        issues.append({
-                            "line": issue.get("line", 0),
-                            "column": issue.get("column", 0),
-                            "severity": issue.get("type", "warning"),
-                            "message": issue.get("message", ""),
-                            "rule": issue.get("message-id", "")
-                        })
-            
-            elif linter == 'eslint':
-                result = subprocess.run([
-                    'eslint', filepath, '--format=json'
-                ], capture_output=True, text=True)
-                
-                if result.stdout:
-                    eslint_result = json.loads(result.stdout)
-                    if eslint_result and len(eslint_result) > 0:
-                        for issue in eslint_result[0].get('messages', []):
-                            issues.append({
-                                "line": issue.get("line", 0),
-                                "column": issue.get("column", 0),
-                                "severity": issue.get("severity", 1) == 2 and "error" or "warning",
-                                "message": issue.get("message", ""),
-                                "rule": issue.get("ruleId", "")
-                            })
-        
-        except Exception as e:
-            print(f"Error running {linter}: {e}", file=sys.stderr)
+    def lint_report(self, linter: str, filepath: str, cancel_token: Optional[CancellationToken] = None):
+        """Get the linter's JSON report, preferring a warm worker over a cold CLI run"""
+        token = cancel_token or CancellationToken()
+        token.raise_if_cancelled()
+        worker = self.linter_workers.get(linter)
+        if worker is not None:
+            remove = token.on_cancel(worker.kill)
+            try:
+                return self.linter_workers.lint(linter, filepath, timeout=token.timeout(self.lint_timeout))
+            except WorkerTimeout:
+                # The CLI would hang on the same file; only crashes fall back
+                token.raise_if_cancelled()
+                raise
+            except WorkerError as e:
+                token.raise_if_cancelled()
+                print(f"Warm {linter} worker failed, falling back to CLI: {e}", file=sys.stderr)
+            finally:
+                remove()
+
+        if linter == 'pylint':
+            cmd = ['pylint', filepath, '--output-format=json', '--disable=C0103,C0114,C0115,C0116']
+        else:
+            cmd = ['eslint', filepath, '--format=json']
+        result = run_process(cmd, self.lint_timeout, token, text=True)
+        return json.loads(result.stdout) if result.stdout else []
+
+    def run_linter(self, linter: str, filepath: str, language: str,
+                   cancel_token: Optional[CancellationToken] = None) -> IssueTable:
+        """Run specific linter and parse output into an IssueTable
+
+        Timeouts and linter failures propagate so the caller can report them.
+        """
+        issues = IssueTable()
+        
+        if linter == 'pylint':
+            pylint_issues = self.lint_report(linter, filepath, cancel_token)
+            for issue in pylint_issues:
+                issues.append(
+                    issue.get("line"),
+                    issue.get("column"),
+                    issue.get("type", "warning"),
+                    issue.get("message", ""),
+                    issue.get("message-id", ""),
+                )
+        
+        elif linter == 'eslint':
+            eslint_result = self.lint_report(linter, filepath, cancel_token)
+            if eslint_result and len(eslint_result) > 0:
+                for issue in eslint_result[0].get('messages', []):
+                    issues.append(
+                        issue.get("line"),
+                        issue.get("column"),
+                        issue.get("severity", 1) == 2 and "error" or "warning",
+                        issue.get("message", ""),
+                        issue.get("ruleId"),
+                    )
 
         return issues
 
@@ -332,8 +602,19 @@ class EnhancedCodeProcessor:
         timeout: int = 5,
         project_dir: Optional[str] = None,
         filename: str = "snippet",
+        on_output: Optional[Callable[[str, str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
     ) -> Dict[str, str]:
-        """Execute code in an isolated sandbox directory."""
+        """Execute code in an isolated sandbox directory.
+
+        Python, JavaScript and TypeScript run on the pre-started sandbox pool
+        when available; on_output receives (stream, text) chunks as they arrive.
+        The pool only hands a snippet back for a direct run if it never started.
+        Raises AnalysisCancelled if cancel_token fires while the snippet runs.
+        """
+        token = cancel_token or CancellationToken()
+        token.raise_if_cancelled()
+        timeout = token.timeout(timeout)
 
         commands = {
             "python": ["python", filename],
@@ -356,31 +637,43 @@ class EnhancedCodeProcessor:
         cmd = commands.get(language)
         if not cmd:
             shutil.rmtree(temp_dir, ignore_errors=True)
-            return {"stdout": "", "stderr": f"Unsupported language: {language}", "timeout": False}
+            return {"stdout": "", "stderr": f"Unsupported language: {language}", "timeout": False, "returncode": None}
 
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                cwd=temp_dir,
-            )
+            if self.sandbox_pool.supports(language):
+                remove = token.on_cancel(self.sandbox_pool.cancel)
+                try:
+                    result = self.sandbox_pool.run(language, temp_dir, filename, timeout, on_output)
+                    token.raise_if_cancelled()
+                    return result
+                except SandboxUnavailable as e:
+                    token.raise_if_cancelled()
+                    print(f"Sandbox pool unavailable, running directly: {e}", file=sys.stderr)
+                finally:
+                    remove()
+
+            result = run_process(cmd, timeout, token, text=True, cwd=temp_dir)
             return {
                 "stdout": result.stdout,
                 "stderr": result.stderr,
                 "timeout": False,
+                "returncode": result.returncode,
             }
         except subprocess.TimeoutExpired as e:
             return {
                 "stdout": e.stdout or "",
                 "stderr": e.stderr or "",
                 "timeout": True,
+                "returncode": None,
             }
+        except FileNotFoundError:
+            return {"stdout": "", "stderr": f"{cmd[0]} is not installed or not in PATH", "timeout": False,
+                    "returncode": None}
         finally:
             shutil.rmtree(temp_dir, ignore_errors=True)
 
-    def prompt_ollama_with_progress(self, code: str, language: str, filename: str, static_issues: List[Dict] = None) -> Dict:
+    def prompt_ollama_with_progress(self, code: str, language: str, filename: str, static_issues: Optional[IssueTable] = None,
+                                    cancel_token: Optional[CancellationToken] = None) -> Dict:
         """Send code to Ollama for AI analysis with progress tracking"""
         
         self.progress_tracker.update("analyzing", 60, f"Initializing AI analysis for {filename}...")
@@ -415,9 +708,9 @@ Format your response in a structured way that's easy to parse. Be conversational
 
         try:
             # Call Ollama with codellama model
-            result = subprocess.run([
+            result = run_process([
                 'ollama', 'run', 'codellama:7b-instruct'
-            ], input=prompt.encode(), capture_output=True, timeout=60)
+            ], 60, cancel_token, input=prompt.encode())
             
             self.progress_tracker.update("generating", 95, "Finalizing AI response...")
             
@@ -449,8 +742,11 @@ Format your response in a structured way that's easy to parse. Be conversational
                 "fallback": True
             }
 
-    def process_code_with_progress(self, code: str, filename: str) -> Dict:
+    def process_code_with_progress(self, code: str, filename: str,
+                                   cancel_token: Optional[CancellationToken] = None) -> Dict:
         """Main processing function with detailed progress tracking"""
+        token = cancel_token or CancellationToken()
+        token.raise_if_cancelled()
         
         # Step 1: Initial setup and language detection
         self.progress_tracker.update("reading", 10, f"Reading {filename}...")
@@ -463,10 +759,11 @@ Format your response in a structured way that's easy to parse. Be conversational
         
         # Step 2: Static analysis
         self.progress_tracker.update("parsing", 40, "Running static analysis...")
-        static_analysis = self.run_static_analysis(code, language, filename)
+        static_analysis = self.run_static_analysis(code, language, filename, token)
+        token.raise_if_cancelled()
         
         # Step 3: AI analysis with progress
-        ai_analysis = self.prompt_ollama_with_progress(code, language, filename, static_analysis['issues'])
+        ai_analysis = self.prompt_ollama_with_progress(code, language, filename, static_analysis['issues'], token)
         
         # Step 4: Generate response
         self.progress_tracker.update("optimizing", 95, "Preparing final response...")
@@ -475,7 +772,8 @@ Format your response in a structured way that's easy to parse. Be conversational
             response_text = ai_analysis['response']
         else:
             # Fallback to basic analysis
-            response_text = self.fallback_analysis(code, language, static_analysis['issues'])
+            response_text = self.fallback_analysis(code, language, static_analysis['issues'],
+                                                   static_analysis.get('error'))
         
         self.progress_tracker.update("complete", 100, "Analysis complete!")
         
@@ -494,7 +792,8 @@ Format your response in a structured way that's easy to parse. Be conversational
         """Legacy method for backward compatibility"""
         return self.process_code_with_progress(code, filename)
 
-    def fallback_analysis(self, code: str, language: str, static_issues: List[Dict]) -> str:
+    def fallback_analysis(self, code: str, language: str, static_issues: IssueTable,
+                          static_error: Optional[str] = None) -> str:
         """Provide enhanced basic analysis when AI is unavailable"""
         lines = code.split('\n')
         analysis = []
@@ -519,6 +818,8 @@ Format your response in a structured way that's easy to parse. Be conversational
                 analysis.append(f"{i}. {severity_emoji} Line {issue['line']}: {issue['message']}")
                 if issue.get('rule'):
                     analysis.append(f"   Rule: {issue['rule']}")
+        elif static_error:
+            analysis.append(f"\n⚠️ **Static analysis did not complete:** {static_error}")
         else:
             analysis.append(f"\n✅ **No static analysis issues found!**")
         
@@ -659,8 +960,14 @@ Format your response in a structured way that's easy to parse. Be conversational
         
         return ''.join(diff)
 
-    def batch_analyze_files(self, file_paths: List[str]) -> List[Dict]:
-        """Analyze multiple files in batch with progress tracking"""
+    def batch_analyze_files(self, file_paths: List[str],
+                            cancel_token: Optional[CancellationToken] = None) -> List[Dict]:
+        """Analyze multiple files in batch with progress tracking
+
+        Files not analyzed before cancel_token fires are returned with
+        'incomplete' set instead of a result.
+        """
+        token = cancel_token or CancellationToken()
         results = []
         total_files = len(file_paths)
         
@@ -668,16 +975,22 @@ Format your response in a structured way that's easy to parse. Be conversational
             filename = os.path.basename(file_path)
             progress = int((i / total_files) * 100)
             
+            if token.cancelled:
+                results.extend(self._incomplete_result(path, token) for path in file_paths[i:])
+                break
             self.progress_tracker.update("analyzing", progress, f"Processing {filename} ({i+1}/{total_files})")
             
             try:
                 with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                     content = f.read()
                 
-                result = self.process_code_with_progress(content, filename)
+                result = self.process_code_with_progress(content, filename, token)
                 result['file_path'] = file_path
                 results.append(result)
                 
+            except AnalysisCancelled:
+                results.extend(self._incomplete_result(path, token) for path in file_paths[i:])
+                break
             except Exception as e:
                 results.append({
                     'filename': filename,
@@ -686,20 +999,252 @@ Format your response in a structured way that's easy to parse. Be conversational
                     'success': False
                 })
         
-        self.progress_tracker.update("complete", 100, f"Batch analysis complete: {len(results)} files processed")
+        if token.cancelled:
+            self.progress_tracker.update("cancelled", 100, f"{token.reason}: batch analysis stopped early")
+        else:
+            self.progress_tracker.update("complete", 100, f"Batch analysis complete: {len(results)} files processed")
         return results
 
+    @staticmethod
+    def _incomplete_result(file_path: str, token: CancellationToken) -> Dict:
+        return {
+            'filename': os.path.basename(file_path),
+            'file_path': file_path,
+            'error': token.reason,
+            'success': False,
+            'incomplete': True
+        }
+
+    def analyze_documents(self, documents: Iterator[Dict],
+                          cancel_token: Optional[CancellationToken] = None,
+                          allow_run: bool = False) -> Iterator[Dict]:
+        """Analyze {filename, content} documents as one batch, yielding results as they finish
+
+        {"action": "run"} documents are executed only with allow_run, so an
+        untrusted document stream can be analysed without running any of it.
+
+        Once cancel_token fires, the document in progress is answered with
+        an 'incomplete' marker and no further input is read (draining a
+        long-lived stdin would block shutdown), so callers must treat
+        documents without a result as not analysed.
+        """
+        token = cancel_token or CancellationToken()
+        count = 0
+        for count, document in enumerate(documents, 1):
+            if 'error' in document:
+                yield {'filename': document.get('filename', ''), 'error': document['error'], 'success': False}
+                continue
+
+            filename = document.get('filename') or "script.py"
+            try:
+                if document.get('action') == 'run':
+                    if not allow_run:
+                        raise ValueError("Running code requires --allow-run")
+                    yield self.run_document(document, filename, token)
+                    continue
+
+                content = document.get('content')
+                if not isinstance(content, str):
+                    raise ValueError("Document content must be a string")
+                result = self.process_code_with_progress(content, filename, token)
+                if document.get('path'):
+                    result['file_path'] = document['path']
+                yield result
+            except AnalysisCancelled:
+                yield {'filename': filename, 'error': token.reason, 'success': False, 'incomplete': True}
+                self.progress_tracker.update("cancelled", 100, f"{token.reason}: {count - 1} documents processed")
+                return
+            except Exception as e:
+                yield {'filename': filename, 'error': str(e), 'success': False}
+
+        self.progress_tracker.update("complete", 100, f"Batch analysis complete: {count} documents processed")
+
+    def run_document(self, document: Dict, filename: str,
+                     cancel_token: Optional[CancellationToken] = None) -> Dict:
+        """Execute a {"action": "run"} document in the sandbox"""
+        code = document.get('content') or ""
+        language = document.get('language') or self.detect_language(filename, code)
+        result = self.run_code_sandbox(
+            code,
+            language,
+            timeout=document.get('timeout', 5),
+            project_dir=document.get('project_dir'),
+            filename=os.path.basename(filename),
+            cancel_token=cancel_token,
+        )
+        result.update({'filename': filename, 'action': 'run', 'language': language})
+        return result
+
+_FRAME_HEADER = struct.Struct("<I")
+
+def read_documents(stream: BinaryIO, framing: str = "ndjson") -> Iterator[Dict]:
+    """Read {filename, content} documents from NDJSON lines or u32 length-prefixed frames"""
+    while True:
+        if framing == "length":
+            header = stream.read(_FRAME_HEADER.size)
+            if not header:
+                return
+            if len(header) < _FRAME_HEADER.size:
+                raise ValueError("Truncated frame header")
+            size = _FRAME_HEADER.unpack(header)[0]
+            payload = stream.read(size)
+            if len(payload) < size:
+                raise ValueError("Truncated frame payload")
+        else:
+            payload = stream.readline()
+            if not payload:
+                return
+            if not payload.strip():
+                continue
+
+        try:
+            document = json.loads(payload)
+            if not isinstance(document, dict):
+                raise ValueError("Each frame must be a JSON object")
+        except ValueError as e:
+            document = {'error': f"Invalid input frame: {e}"}
+        yield document
+
+def mark_idle(documents: Iterator[Dict], idle: threading.Event) -> Iterator[Dict]:
+    """Pass documents through, with idle set while waiting for the next one"""
+    while True:
+        idle.set()
+        try:
+            document = next(documents, None)
+        finally:
+            idle.clear()
+        if document is None:
+            return
+        yield document
+
+def write_frame(stream: BinaryIO, result: Dict, framing: str = "ndjson", output_format: str = "json"):
+    """Write one result frame in the same framing the input used"""
+    if output_format == "compact":
+        payload = encode_compact(result)
+    else:
+        payload = json.dumps(result, separators=(',', ':'), default=to_jsonable).encode('utf-8')
+
+    if framing == "length":
+        stream.write(_FRAME_HEADER.pack(len(payload)))
+        stream.write(payload)
+    else:
+        stream.write(payload + b"\n")
+    stream.flush()
+
+def pop_option(argv: List[str], name: str, default: Optional[str] = None,
+               choices: Optional[Tuple[str, ...]] = None) -> Optional[str]:
+    """Remove a --name value / --name=value option from argv and return its value"""
+    value = default
+    for i, arg in enumerate(argv):
+        if arg.startswith(f"{name}="):
+            value = arg.split("=", 1)[1]
+            del argv[i]
+            break
+        if arg == name and i + 1 < len(argv):
+            value = argv[i + 1]
+            del argv[i:i + 2]
+            break
+    if choices and value not in choices:
+        print(f"Unknown value for {name}: {value}", file=sys.stderr)
+        sys.exit(1)
+    return value
+
+def write_result(result, output_format: str = "json"):
+    """Write a result to stdout as indented JSON or the compact binary format"""
+    if output_format == "compact":
+        sys.stdout.buffer.write(encode_compact(result))
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(result, indent=2, default=to_jsonable))
+
 def main():
     """Enhanced CLI interface for testing"""
-    if len(sys.argv) < 2:
-        print("Usage: python processor.py <code_content_or_directory> [filename]")
+    output_format = pop_option(sys.argv, "--format", "json", ("json", "compact"))
+    input_path = pop_option(sys.argv, "--input")
+    framing = pop_option(sys.argv, "--framing", "ndjson", ("ndjson", "length"))
+    deadline = pop_option(sys.argv, "--deadline")
+    watch = "--watch" in sys.argv
+    if watch:
+        sys.argv.remove("--watch")
+    allow_run = "--allow-run" in sys.argv
+    if allow_run:
+        sys.argv.remove("--allow-run")
+    if len(sys.argv) < 2 and input_path is None:
+        print("Usage: python processor.py [--format json|compact] <code_content_or_directory> [filename]")
+        print("       python processor.py --input <path|-> [--framing ndjson|length] [--format json|compact]")
+        print("       python processor.py --watch <directory> [--framing ndjson|length] [--format json|compact]")
+        print("Options:")
+        print("  --deadline SECONDS  stop after SECONDS and return partial results marked incomplete")
+        print("  --allow-run         execute {\"action\": \"run\"} documents from --input (off by default)")
         print("Examples:")
         print("  python processor.py 'print(\"hello\")' script.py")
         print("  python processor.py /path/to/project/")
+        print("  python processor.py --format compact /path/to/project/")
+        print("  python processor.py --input - < documents.ndjson")
+        print("  python processor.py --watch /path/to/project/")
         sys.exit(1)
     
-    input_arg = sys.argv[1]
+    if output_format == "compact" and framing == "ndjson" and (input_path is not None or watch):
+        print("Compact output requires --framing length", file=sys.stderr)
+        sys.exit(1)
+
+    if watch and deadline is not None:
+        print("--deadline cannot be combined with --watch", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        cancel_token = CancellationToken(float(deadline) if deadline is not None else None)
+    except ValueError:
+        print(f"Invalid deadline: {deadline}", file=sys.stderr)
+        sys.exit(1)
+
+    # SIGINT/SIGTERM stop the analysis but still print what was completed.
+    # With nothing in flight (waiting for input), or on a second signal,
+    # there is nothing to finish, so exit straight away.
+    idle = threading.Event()
+    stop_event = threading.Event()
+
+    def interrupt(signum, frame):
+        if idle.is_set() or cancel_token.reason == "Interrupted":
+            raise SystemExit(128 + signum)
+        stop_event.set()
+        cancel_token.cancel("Interrupted")
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, interrupt)
+
     processor = EnhancedCodeProcessor()
+
+    # Watch mode: initial analysis, then streamed updates for changed files
+    if watch:
+        directory = sys.argv[1]
+        if not os.path.isdir(directory):
+            print(f"Not a directory: {directory}", file=sys.stderr)
+            sys.exit(1)
+        processor.watch_directory(
+            directory,
+            lambda update: write_frame(sys.stdout.buffer, update, framing, output_format),
+            stop_event,
+            cancel_token=cancel_token,
+        )
+        return
+
+    # Bulk input: {filename, content} documents from stdin or a file, results streamed back
+    if input_path is not None:
+        stream = sys.stdin.buffer if input_path == "-" else open(input_path, "rb")
+        documents = mark_idle(read_documents(stream, framing), idle)
+        try:
+            for result in processor.analyze_documents(documents, cancel_token, allow_run):
+                write_frame(sys.stdout.buffer, result, framing, output_format)
+        except ValueError as e:
+            print(f"Input error: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+        return
+
+    input_arg = sys.argv[1]
     
     # Check for run sandbox option
     if input_arg == "--run" and len(sys.argv) >= 3:
@@ -708,24 +1253,31 @@ def main():
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
             code = f.read()
         language = processor.detect_language(file_path, code)
-        result = processor.run_code_sandbox(
-            code,
-            language,
-            project_dir=project_dir,
-            filename=os.path.basename(file_path),
-        )
+        try:
+            result = processor.run_code_sandbox(
+                code,
+                language,
+                project_dir=project_dir,
+                filename=os.path.basename(file_path),
+                cancel_token=cancel_token,
+            )
+        except AnalysisCancelled as e:
+            result = {"stdout": "", "stderr": str(e), "timeout": False, "returncode": None, "incomplete": True}
     # Check if input is a directory
     elif os.path.isdir(input_arg):
         print(f"Analyzing directory: {input_arg}", file=sys.stderr)
-        result = processor.analyze_directory(input_arg)
+        result = processor.analyze_directory(input_arg, cancel_token)
     else:
         # Treat as code content
         code = input_arg
         filename = sys.argv[2] if len(sys.argv) > 2 else "script.py"
         print(f"Analyzing code: {filename}", file=sys.stderr)
-        result = processor.process_code_with_progress(code, filename)
+        try:
+            result = processor.process_code_with_progress(code, filename, cancel_token)
+        except AnalysisCancelled as e:
+            result = {"filename": filename, "error": str(e), "success": False, "incomplete": True}
     
-    print(json.dumps(result, indent=2))
+    write_result(result, output_format)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Issue records and compact wire format for PatchPilot
+Slotted issue records, columnar issue storage and a length-prefixed
+binary encoding used as an opt-in alternative to JSON output
+"""
+
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+# Magic header for the compact wire format ("PatchPilot Binary v1")
+COMPACT_MAGIC = b"PPB1"
+
+_TAG_NONE = b"N"
+_TAG_TRUE = b"T"
+_TAG_FALSE = b"F"
+_TAG_INT = b"i"
+_TAG_FLOAT = b"d"
+_TAG_STR = b"s"
+_TAG_LIST = b"l"
+_TAG_MAP = b"m"
+_TAG_ISSUES = b"I"
+
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+
+# array() uses native byte order, the wire format is always little-endian
+_SWAP = sys.byteorder == "big"
+
+
+# Stored in place of a missing line, column or rule, which linters may omit
+_ABSENT = 0xFFFFFFFF
+
+
+class Issue:
+    """A single static analysis issue
+
+    line, column and rule are None when the linter did not report them
+    (for example ESLint's ruleId for parse errors).
+    """
+
+    __slots__ = ("line", "column", "severity", "message", "rule")
+
+    def __init__(self, line: Optional[int] = 0, column: Optional[int] = 0, severity: str = "warning",
+                 message: str = "", rule: Optional[str] = ""):
+        self.line = line
+        self.column = column
+        self.severity = severity
+        self.message = message
+        self.rule = rule
+
+    def __getitem__(self, key: str):
+        # Allows existing dict-style consumers (issue['line']) to keep working
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Issue):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Issue({self.line}:{self.column} {self.severity} {self.rule!r} {self.message!r})"
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Issue":
+        return cls(
+            data.get("line"),
+            data.get("column"),
+            data.get("severity", "warning") or "warning",
+            data.get("message", "") or "",
+            data.get("rule"),
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "line": self.line,
+            "column": self.column,
+            "severity": self.severity,
+            "message": self.message,
+            "rule": self.rule,
+        }
+
+
+class IssueTable:
+    """Columnar issue storage
+
+    Line and column numbers live in unsigned int arrays, rule ids and
+    severities are interned into small code tables so that tens of
+    thousands of issues cost a few bytes each instead of a dict apiece.
+    Missing lines, columns and rules are kept as None.
+    """
+
+    __slots__ = ("lines", "columns", "severity_codes", "rule_codes",
+                 "messages", "severities", "rules", "_severity_index", "_rule_index")
+
+    def __init__(self):
+        self.lines = array("I")
+        self.columns = array("I")
+        self.severity_codes = array("B")
+        self.rule_codes = array("I")
+        self.messages: List[str] = []
+        self.severities: List[str] = []
+        self.rules: List[str] = []
+        self._severity_index: Dict[str, int] = {}
+        self._rule_index: Dict[str, int] = {}
+
+    @staticmethod
+    def _intern(value: str, table: List[str], index: Dict[str, int]) -> int:
+        code = index.get(value)
+        if code is None:
+            code = len(table)
+            table.append(value)
+            index[value] = code
+        return code
+
+    @staticmethod
+    def _position(value: Optional[int]) -> int:
+        return _ABSENT if value is None else min(max(int(value), 0), _ABSENT - 1)
+
+    def append(self, line: Optional[int], column: Optional[int], severity: str, message: str,
+               rule: Optional[str] = None):
+        """Add one issue to the table"""
+        self.lines.append(self._position(line))
+        self.columns.append(self._position(column))
+        self.severity_codes.append(self._intern(severity or "warning", self.severities, self._severity_index))
+        self.rule_codes.append(_ABSENT if rule is None else self._intern(rule, self.rules, self._rule_index))
+        self.messages.append(message or "")
+
+    def append_issue(self, issue: Issue):
+        self.append(issue.line, issue.column, issue.severity, issue.message, issue.rule)
+
+    @classmethod
+    def from_dicts(cls, issues: List[Dict]) -> "IssueTable":
+        table = cls()
+        for issue in issues:
+            table.append(
+                issue.get("line"),
+                issue.get("column"),
+                issue.get("severity", "warning"),
+                issue.get("message", ""),
+                issue.get("rule"),
+            )
+        return table
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        line = self.lines[index]
+        column = self.columns[index]
+        rule = self.rule_codes[index]
+        return Issue(
+            None if line == _ABSENT else line,
+            None if column == _ABSENT else column,
+            self.severities[self.severity_codes[index]],
+            self.messages[index],
+            None if rule == _ABSENT else self.rules[rule],
+        )
+
+    def __iter__(self) -> Iterator[Issue]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_dicts(self) -> List[Dict]:
+        return [issue.to_dict() for issue in self]
+
+
+def to_jsonable(value):
+    """json.dumps default hook for records kept inside processor results"""
+    if isinstance(value, IssueTable):
+        return value.to_dicts()
+    if isinstance(value, Issue):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode_str(value: str, out: List[bytes]):
+    raw = value.encode("utf-8", errors="surrogatepass")
+    out.append(_U32.pack(len(raw)))
+    out.append(raw)
+
+
+def _encode_array(values: array, out: List[bytes]):
+    if _SWAP:
+        values = array(values.typecode, values)
+        values.byteswap()
+    raw = values.tobytes()
+    out.append(_U32.pack(len(raw)))
+    out.append(raw)
+
+
+def _encode(value, out: List[bytes]):
+    if value is None:
+        out.append(_TAG_NONE)
+    elif value is True:
+        out.append(_TAG_TRUE)
+    elif value is False:
+        out.append(_TAG_FALSE)
+    elif isinstance(value, int):
+        out.append(_TAG_INT)
+        out.append(_I64.pack(value))
+    elif isinstance(value, float):
+        out.append(_TAG_FLOAT)
+        out.append(_F64.pack(value))
+    elif isinstance(value, str):
+        out.append(_TAG_STR)
+        _encode_str(value, out)
+    elif isinstance(value, IssueTable):
+        out.append(_TAG_ISSUES)
+        out.append(_U32.pack(len(value)))
+        for table in (value.severities, value.rules):
+            out.append(_U32.pack(len(table)))
+            for item in table:
+                _encode_str(item, out)
+        for column in (value.lines, value.columns, value.severity_codes, value.rule_codes):
+            _encode_array(column, out)
+        for message in value.messages:
+            _encode_str(message, out)
+    elif isinstance(value, Issue):
+        _encode(value.to_dict(), out)
+    elif isinstance(value, dict):
+        out.append(_TAG_MAP)
+        out.append(_U32.pack(len(value)))
+        for key, item in value.items():
+            _encode_str(str(key), out)
+            _encode(item, out)
+    elif isinstance(value, (list, tuple)):
+        out.append(_TAG_LIST)
+        out.append(_U32.pack(len(value)))
+        for item in value:
+            _encode(item, out)
+    else:
+        out.append(_TAG_STR)
+        _encode_str(str(value), out)
+
+
+def encode_compact(value) -> bytes:
+    """Serialize a result to the compact binary format"""
+    out = [COMPACT_MAGIC]
+    _encode(value, out)
+    return b"".join(out)
+
+
+class _Reader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def take(self, size: int) -> memoryview:
+        end = self.pos + size
+        if end > len(self.data):
+            raise ValueError("Truncated compact payload")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def u32(self) -> int:
+        return _U32.unpack(self.take(4))[0]
+
+    def string(self) -> str:
+        return str(self.take(self.u32()), "utf-8", errors="surrogatepass")
+
+    def array(self, typecode: str) -> array:
+        values = array(typecode)
+        values.frombytes(self.take(self.u32()))
+        if _SWAP:
+            values.byteswap()
+        return values
+
+
+def _decode(reader: _Reader):
+    tag = bytes(reader.take(1))
+    if tag == _TAG_NONE:
+        return None
+    if tag == _TAG_TRUE:
+        return True
+    if tag == _TAG_FALSE:
+        return False
+    if tag == _TAG_INT:
+        return _I64.unpack(reader.take(8))[0]
+    if tag == _TAG_FLOAT:
+        return _F64.unpack(reader.take(8))[0]
+    if tag == _TAG_STR:
+        return reader.string()
+    if tag == _TAG_LIST:
+        return [_decode(reader) for _ in range(reader.u32())]
+    if tag == _TAG_MAP:
+        count = reader.u32()
+        result = {}
+        for _ in range(count):
+            key = reader.string()
+            result[key] = _decode(reader)
+        return result
+    if tag == _TAG_ISSUES:
+        count = reader.u32()
+        table = IssueTable()
+        table.severities = [reader.string() for _ in range(reader.u32())]
+        table.rules = [reader.string() for _ in range(reader.u32())]
+        table._severity_index = {value: code for code, value in enumerate(table.severities)}
+        table._rule_index = {value: code for code, value in enumerate(table.rules)}
+        table.lines = reader.array("I")
+        table.columns = reader.array("I")
+        table.severity_codes = reader.array("B")
+        table.rule_codes = reader.array("I")
+        table.messages = [reader.string() for _ in range(count)]
+        return table
+    raise ValueError(f"Unknown compact tag: {tag!r}")
+
+
+def decode_compact(data: bytes, as_tables: bool = False):
+    """Deserialize a compact payload
+
+    Issue lists come back as IssueTable instances when as_tables is set,
+    otherwise they are expanded to plain dicts matching the JSON output.
+    """
+    if data[:len(COMPACT_MAGIC)] != COMPACT_MAGIC:
+        raise ValueError("Not a PatchPilot compact payload")
+    reader = _Reader(data)
+    reader.pos = len(COMPACT_MAGIC)
+    value = _decode(reader)
+    return value if as_tables else _expand_tables(value)
+
+
+def _expand_tables(value):
+    if isinstance(value, IssueTable):
+        return value.to_dicts()
+    if isinstance(value, dict):
+        return {key: _expand_tables(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_expand_tables(item) for item in value]
+    return value
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+Pre-started sandbox runners for PatchPilot
+Python snippets run in children forked from a warm interpreter, JavaScript
+and TypeScript snippets in Node processes started ahead of time, so a
+run skips interpreter (and ts-node) startup while keeping one fresh
+process per snippet
+"""
+
+import atexit
+import codecs
+import json
+import os
+import selectors
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import queue
+import runpy
+import time
+import traceback
+from typing import Callable, Dict, Optional
+
+from linter_workers import node_env
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+NODE_RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_runner.cjs")
+
+# prctl option from linux/prctl.h
+PR_SET_PDEATHSIG = 1
+
+# Exit code sandbox_runner.cjs uses when it cannot serve a language
+RUNNER_UNAVAILABLE = 78
+
+DEFAULT_LIMITS = {
+    "cpu_seconds": 10,
+    "memory_mb": 512,
+    "open_files": 64,
+}
+
+OutputCallback = Callable[[str, str], None]
+
+
+class SandboxUnavailable(Exception):
+    """Raised when the pool could not start a snippet and the caller should fall back
+
+    Only raised before the runner accepted the request, so falling back
+    never runs a snippet twice.
+    """
+
+
+def apply_rlimits(limits: Dict):
+    """Apply CPU, memory and open file limits to the current process"""
+    if resource is None:
+        return
+    cpu = limits.get("cpu_seconds")
+    if cpu:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    memory = limits.get("memory_mb")
+    if memory:
+        size = memory * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (size, size))
+    files = limits.get("open_files")
+    if files:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (files, files))
+
+
+def _cpu_seconds_used(pid: int) -> int:
+    """CPU time a process has used so far, rounded up (Linux /proc only)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        ticks = int(fields[11]) + int(fields[12])
+        return -(-ticks // os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def limit_process(pid: int, limits: Dict):
+    """Apply CPU and open file limits to a running child with prlimit (Linux)
+
+    Used instead of preexec_fn, which is unsafe once the parent has threads.
+    The CPU budget starts now: time already spent, such as loading a
+    runtime, is added on top so it does not count against the snippet.
+    """
+    if resource is None or not hasattr(resource, "prlimit"):
+        return
+    try:
+        cpu = limits.get("cpu_seconds")
+        if cpu:
+            budget = _cpu_seconds_used(pid) + cpu
+            resource.prlimit(pid, resource.RLIMIT_CPU, (budget, budget + 1))
+        files = limits.get("open_files")
+        if files:
+            resource.prlimit(pid, resource.RLIMIT_NOFILE, (files, files))
+    except (OSError, ValueError):
+        # The runner already exited; run() notices that on its own
+        pass
+
+
+def pump_output(fds: Dict[str, int], deadline: float, on_output: OutputCallback,
+                kill: Callable[[], None]) -> bool:
+    """Forward output from the given fds as it arrives until EOF
+
+    Calls kill() once the deadline passes and returns whether it did.
+    Closes the fds.
+    """
+    selector = selectors.DefaultSelector()
+    decoders = {}
+    for name, fd in fds.items():
+        selector.register(fd, selectors.EVENT_READ, name)
+        decoders[name] = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    timed_out = False
+    try:
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if timed_out:
+                    # Killed but something still holds the pipes open
+                    break
+                timed_out = True
+                kill()
+                deadline = time.monotonic() + 1
+                continue
+            for key, _ in selector.select(remaining):
+                data = os.read(key.fd, 65536)
+                if not data:
+                    selector.unregister(key.fd)
+                    text = decoders[key.data].decode(b"", final=True)
+                else:
+                    text = decoders[key.data].decode(data)
+                if text:
+                    on_output(key.data, text)
+    finally:
+        selector.close()
+        for fd in fds.values():
+            os.close(fd)
+    return timed_out
+
+
+class PythonForkServer:
+    """Warm interpreter that forks a fresh child for every snippet
+
+    Output is relayed as NDJSON frames; the server is recycled after
+    max_runs snippets or if it dies.
+    """
+
+    def __init__(self, limits: Dict, max_runs: int = 200):
+        self.limits = limits
+        self.max_runs = max_runs
+        self.process: Optional[subprocess.Popen] = None
+        self._frames: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self._next_id = 0
+        self._runs = 0
+
+    def start(self):
+        self._frames = queue.Queue()
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "python"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        self._runs = 0
+        reader = threading.Thread(
+            target=self._read_frames,
+            args=(self.process.stdout, self._frames),
+            daemon=True,
+        )
+        reader.start()
+
+    @staticmethod
+    def _read_frames(stream, frames: "queue.Queue[Optional[Dict]]"):
+        for line in stream:
+            try:
+                frames.put(json.loads(line))
+            except ValueError:
+                continue
+        frames.put(None)
+
+    def stop(self):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def kill(self):
+        """Stop the server immediately; a running snippet child dies with it"""
+        process = self.process
+        if process is not None:
+            process.kill()
+
+    def run(self, directory: str, filename: str, timeout: float,
+            on_output: OutputCallback) -> Dict:
+        if self.process is None or self.process.poll() is not None:
+            self.stop()
+            self.start()
+
+        self._next_id += 1
+        request_id = self._next_id
+        request = {
+            "id": request_id,
+            "dir": directory,
+            "file": filename,
+            "timeout": timeout,
+            "limits": self.limits,
+        }
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except OSError:
+            self.stop()
+            raise SandboxUnavailable("Python runner is not accepting requests")
+
+        # The server enforces the snippet timeout; this only guards against a hung server
+        deadline = time.monotonic() + timeout + 5
+        accepted = False
+        while True:
+            try:
+                frame = self._frames.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                frame = {"error": "Python runner stopped responding"}
+            if frame is None:
+                frame = {"error": "Python runner exited"}
+            if "error" in frame:
+                self.stop()
+                if not accepted:
+                    raise SandboxUnavailable(frame["error"])
+                # The snippet may have run already; report it instead of running it again
+                return {"returncode": None, "timeout": False, "error": frame["error"] + " during the run"}
+            if frame.get("id") != request_id:
+                continue
+            if frame.get("accepted"):
+                accepted = True
+            elif "stream" in frame:
+                on_output(frame["stream"], frame["data"])
+            elif frame.get("done"):
+                break
+
+        self._runs += 1
+        if self._runs >= self.max_runs:
+            self.stop()
+        return {"returncode": frame.get("returncode"), "timeout": frame.get("timeout", False)}
+
+
+class NodeRunner:
+    """A Node process started ahead of time that runs exactly one snippet"""
+
+    def __init__(self, language: str, limits: Dict, env: Dict[str, str]):
+        node = shutil.which("node")
+        if not node or not os.path.exists(NODE_RUNNER):
+            raise SandboxUnavailable("Node.js is not available")
+        self.language = language
+        self.limits = limits
+        command = [node, NODE_RUNNER, language]
+        if limits.get("memory_mb"):
+            # V8 reserves far more address space than it uses, so cap the heap instead of RLIMIT_AS
+            command.insert(1, f"--max-old-space-size={limits['memory_mb']}")
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+            start_new_session=True,
+        )
+
+    def run(self, directory: str, filename: str, timeout: float,
+            on_output: OutputCallback) -> Dict:
+        if self.process.poll() is not None:
+            self.discard()
+            raise SandboxUnavailable(f"{self.language} runner exited before use")
+
+        # Limits go on only now, so preloading the runtime is not billed to the snippet
+        limit_process(self.process.pid, self.limits)
+        request = json.dumps({"dir": directory, "file": filename}) + "\n"
+        try:
+            self.process.stdin.write(request.encode("utf-8"))
+            self.process.stdin.close()
+        except OSError:
+            self.discard()
+            raise SandboxUnavailable(f"{self.language} runner is not accepting requests")
+
+        fds = {
+            "stdout": os.dup(self.process.stdout.fileno()),
+            "stderr": os.dup(self.process.stderr.fileno()),
+        }
+        self.process.stdout.close()
+        self.process.stderr.close()
+        output = []
+
+        def forward(stream: str, text: str):
+            output.append(text)
+            on_output(stream, text)
+
+        timed_out = pump_output(fds, time.monotonic() + timeout, forward, self.kill)
+        returncode = self.process.wait()
+        if returncode == RUNNER_UNAVAILABLE and not output:
+            raise SandboxUnavailable(f"{self.language} runtime is not installed")
+        return {"returncode": returncode, "timeout": timed_out}
+
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+    def discard(self):
+        self.kill()
+        self.process.wait()
+
+
+class SandboxPool:
+    """Per-language pre-started runners used by run_code_sandbox"""
+
+    NODE_LANGUAGES = ("javascript", "typescript")
+
+    def __init__(self, limits: Optional[Dict] = None, max_runs: int = 200, max_failures: int = 3):
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.max_runs = max_runs
+        self.max_failures = max_failures
+        self._python: Optional[PythonForkServer] = None
+        self._spares: Dict[str, NodeRunner] = {}
+        self._unavailable = set()
+        self._failures: Dict[str, int] = {}
+        self._node_env: Optional[Dict[str, str]] = None
+        self._active = None
+        self._cancelling = False
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def supports(self, language: str) -> bool:
+        if not hasattr(os, "fork") or language in self._unavailable:
+            return False
+        return language == "python" or language in self.NODE_LANGUAGES
+
+    def warm(self, *languages: str):
+        """Start runners ahead of the first request"""
+        with self._lock:
+            for language in languages:
+                if not self.supports(language):
+                    continue
+                try:
+                    if language == "python":
+                        if self._python is None:
+                            self._python = PythonForkServer(self.limits, self.max_runs)
+                            self._python.start()
+                    elif language not in self._spares:
+                        self._spares[language] = self._spawn_node(language)
+                except SandboxUnavailable:
+                    self._unavailable.add(language)
+
+    def _spawn_node(self, language: str) -> NodeRunner:
+        if self._node_env is None:
+            self._node_env = node_env()
+        return NodeRunner(language, self.limits, self._node_env)
+
+    def run(self, language: str, directory: str, filename: str, timeout: float = 5,
+            on_output: Optional[OutputCallback] = None) -> Dict:
+        """Run a snippet already written to directory/filename
+
+        Returns the same shape as run_code_sandbox: stdout, stderr, timeout,
+        returncode. Raises SandboxUnavailable only if the snippet never
+        started; a runner dying mid-run is reported in stderr and the runner
+        is restarted on the next request.
+        """
+        if not self.supports(language):
+            raise SandboxUnavailable(f"No pooled runner for {language}")
+
+        stdout, stderr = [], []
+
+        def collect(stream: str, text: str):
+            (stdout if stream == "stdout" else stderr).append(text)
+            if on_output:
+                on_output(stream, text)
+
+        with self._lock:
+            self._cancelling = False
+            try:
+                if language == "python":
+                    if self._python is None:
+                        self._python = PythonForkServer(self.limits, self.max_runs)
+                    self._active = self._python
+                    outcome = self._python.run(directory, filename, timeout, collect)
+                else:
+                    runner = self._spares.pop(language, None) or self._spawn_node(language)
+                    # Start the replacement now so it is warm by the next request
+                    self._spares[language] = self._spawn_node(language)
+                    self._active = runner
+                    outcome = runner.run(directory, filename, timeout, collect)
+            except SandboxUnavailable:
+                if not self._cancelling:
+                    self._record_failure(language)
+                raise
+            finally:
+                self._active = None
+            self._failures.pop(language, None)
+
+        if outcome.get("error"):
+            collect("stderr", outcome["error"] + "\n")
+        return {
+            "stdout": "".join(stdout),
+            "stderr": "".join(stderr),
+            "timeout": outcome["timeout"],
+            "returncode": outcome["returncode"],
+        }
+
+    def _record_failure(self, language: str):
+        """Stop using the pool for a language after repeated start failures"""
+        self._failures[language] = self._failures.get(language, 0) + 1
+        if self._failures[language] >= self.max_failures:
+            self._unavailable.add(language)
+            spare = self._spares.pop(language, None)
+            if spare is not None:
+                spare.discard()
+
+    def cancel(self):
+        """Kill the snippet currently running, from any thread"""
+        self._cancelling = True
+        active = self._active
+        if active is not None:
+            active.kill()
+
+    def shutdown(self):
+        if self._python is not None:
+            self._python.stop()
+            self._python = None
+        for runner in self._spares.values():
+            runner.discard()
+        self._spares.clear()
+
+
+def _die_with_parent():
+    """Have the kernel kill this process if the fork server dies (Linux only)"""
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.prctl(PR_SET_PDEATHSIG, signal.SIGKILL)
+    except (OSError, AttributeError):
+        pass
+
+
+def _run_python_child(request: Dict, protocol_fd: int):
+    """Body of a forked snippet process; never returns"""
+    code = 1
+    try:
+        _die_with_parent()
+        os.close(protocol_fd)
+        apply_rlimits(request.get("limits") or {})
+        os.chdir(request["dir"])
+        sys.stdin = open(os.devnull)
+        sys.stdout = os.fdopen(1, "w", buffering=1, closefd=False)
+        sys.stderr = os.fdopen(2, "w", buffering=1, closefd=False)
+        path = os.path.join(request["dir"], request["file"])
+        sys.argv = [path]
+        sys.path[0] = request["dir"]
+        try:
+            runpy.run_path(path, run_name="__main__")
+            code = 0
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException as e:
+            # Hide the runner's own frames from the snippet's traceback
+            tb = e.__traceback__
+            while tb is not None and tb.tb_frame.f_code.co_filename != path:
+                tb = tb.tb_next
+            traceback.print_exception(type(e), e, tb or e.__traceback__)
+            code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def serve_python():
+    """Fork server loop: one {"id", "dir", "file", "timeout", "limits"} request per line"""
+    protocol_fd = os.dup(1)
+    protocol = os.fdopen(protocol_fd, "w", buffering=1)
+    # Keep stray prints away from the protocol stream
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 1)
+
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            continue
+        request_id = request.get("id")
+        # Tells the pool the snippet is about to run, so it must not be retried elsewhere
+        protocol.write(json.dumps({"id": request_id, "accepted": True}) + "\n")
+
+        def emit(stream: str, data: str):
+            protocol.write(json.dumps({"id": request_id, "stream": stream, "data": data}) + "\n")
+
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.setsid()
+            os.close(out_r)
+            os.close(err_r)
+            os.dup2(devnull, 0)
+            os.dup2(out_w, 1)
+            os.dup2(err_w, 2)
+            os.close(out_w)
+            os.close(err_w)
+            _run_python_child(request, protocol_fd)
+        os.close(out_w)
+        os.close(err_w)
+
+        def kill():
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+        deadline = time.monotonic() + float(request.get("timeout", 5))
+        timed_out = pump_output({"stdout": out_r, "stderr": err_r}, deadline, emit, kill)
+        _, status = os.waitpid(pid, 0)
+        returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        protocol.write(json.dumps({
+            "id": request_id,
+            "done": True,
+            "returncode": returncode,
+            "timeout": timed_out,
+        }) + "\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "python":
+        serve_python()
+    else:
+        print("Usage: python sandbox_pool.py python", file=sys.stderr)
+        sys.exit(1)
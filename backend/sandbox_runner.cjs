@@ -0,0 +1,57 @@
+#!/usr/bin/env node
+// Pre-started Node sandbox runner for PatchPilot (see sandbox_pool.py).
+// Loads the runtime (and a warm ts-node service for TypeScript) ahead of time, then waits
+// for a single {"dir", "file"} request on stdin and runs that file as main.
+// Each runner executes exactly one snippet and exits.
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const Module = require('module');
+
+// Exit code telling the pool this runner cannot serve the language
+const UNAVAILABLE = 78;
+
+let tsNode = null;
+let tsService = null;
+if (process.argv[2] === 'typescript') {
+  try {
+    tsNode = require('ts-node');
+    require('typescript');
+  } catch {
+    process.exit(UNAVAILABLE);
+  }
+  // Build the type-checking service and load lib.d.ts now, while the runner is idle;
+  // snippets without a tsconfig.json of their own reuse it as is
+  tsService = tsNode.create({ skipProject: true });
+  tsService.compile('const warmup: number = 1;\n', path.join(os.tmpdir(), 'patchpilot-warmup.ts'));
+}
+
+let buffer = '';
+
+const onData = (chunk) => {
+  buffer += chunk;
+  const newline = buffer.indexOf('\n');
+  if (newline < 0) {
+    return;
+  }
+  process.stdin.removeListener('data', onData);
+  process.stdin.destroy();
+
+  const request = JSON.parse(buffer.slice(0, newline));
+  process.chdir(request.dir);
+  if (tsNode) {
+    // Type-checked like `ts-node file`; a project tsconfig.json needs its own service
+    if (fs.existsSync(path.join(request.dir, 'tsconfig.json'))) {
+      tsNode.register();
+    } else {
+      tsNode.register(tsService);
+    }
+  }
+  const file = path.resolve(request.file);
+  process.argv = [process.argv[0], file];
+  Module._load(file, null, true);
+};
+
+process.stdin.setEncoding('utf8');
+process.stdin.on('data', onData);
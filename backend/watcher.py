@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+File change watching for PatchPilot
+Collects changes under a directory with inotify (Linux) or by polling,
+then debounces and coalesces bursts into single batches of paths
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+SKIP_DIRS = {'.git', '__pycache__', 'node_modules', '.vscode', '.idea'}
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def walk_directories(root: str) -> Iterator[str]:
+    """Yield root and every subdirectory that analysis does not skip"""
+    for current, dirs, _ in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        yield current
+
+
+def list_entries(directory: str) -> Set[str]:
+    try:
+        return {os.path.join(directory, name) for name in os.listdir(directory)}
+    except OSError:
+        return set()
+
+
+class InotifyBackend:
+    """Recursive inotify watch set; raises OSError where inotify is unavailable"""
+
+    def __init__(self, root: str):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not supported on this platform")
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self._dirs: Dict[int, str] = {}
+        self.overflowed = False
+        for directory in walk_directories(root):
+            self._add_watch(directory)
+
+    def _add_watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+    def _remove_watches(self, directory: str):
+        """Drop the watches for a directory tree that moved away"""
+        prefix = directory + os.sep
+        for wd, path in list(self._dirs.items()):
+            if path == directory or path.startswith(prefix):
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self._dirs[wd]
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        """Block up to timeout seconds and return the paths that changed"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and os.path.basename(path) not in SKIP_DIRS:
+                        # New directory: watch it and pick up files created before the watch existed
+                        for sub in walk_directories(path):
+                            self._add_watch(sub)
+                            changed.update(list_entries(sub))
+                    elif mask & (IN_DELETE | IN_MOVED_FROM):
+                        if mask & IN_MOVED_FROM:
+                            # A moved directory keeps its watches, now under a path that is gone
+                            self._remove_watches(path)
+                        changed.add(path)
+                    continue
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """Fallback that diffs (mtime, size) snapshots of the tree"""
+
+    def __init__(self, root: str, interval: float = 1.0):
+        self.root = root
+        self.interval = interval
+        self.overflowed = False
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for directory in walk_directories(self.root):
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                    except OSError:
+                        continue
+        return snapshot
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        snapshot = self._scan()
+        previous, self._snapshot = self._snapshot, snapshot
+        changed = {path for path, stamp in snapshot.items() if previous.get(path) != stamp}
+        changed.update(path for path in previous if path not in snapshot)
+        return changed
+
+    def close(self):
+        pass
+
+
+class DirectoryWatcher:
+    """Debounced change batches for a directory tree
+
+    A batch is emitted once no new event has arrived for `debounce`
+    seconds (or after `max_delay` during a continuous burst), with
+    duplicate events for the same path coalesced. Paths that no longer
+    exist bypass `include`, so deleted or moved-away directories still
+    produce a batch.
+    """
+
+    def __init__(self, root: str, debounce: float = 0.3, max_delay: float = 2.0,
+                 include: Optional[Callable[[str], bool]] = None, polling: bool = False):
+        self.root = os.path.abspath(root)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.include = include or (lambda path: True)
+        self.backend = None
+        if not polling:
+            try:
+                self.backend = InotifyBackend(self.root)
+            except OSError:
+                self.backend = None
+        if self.backend is None:
+            self.backend = PollingBackend(self.root)
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if isinstance(self.backend, InotifyBackend) else "polling"
+
+    def batches(self, stop_event: Optional[threading.Event] = None) -> Iterator[Set[str]]:
+        """Yield sets of changed paths until stop_event is set"""
+        stop_event = stop_event or threading.Event()
+        try:
+            while not stop_event.is_set():
+                # Wake up once a second at most to notice stop requests
+                pending = self.backend.wait(1.0)
+                if not pending and not self.backend.overflowed:
+                    continue
+                started = time.monotonic()
+                while time.monotonic() - started < self.max_delay:
+                    more = self.backend.wait(self.debounce)
+                    if not more:
+                        break
+                    pending |= more
+
+                if self.backend.overflowed:
+                    # Events were dropped; treat every file in the tree as changed
+                    self.backend.overflowed = False
+                    for directory in walk_directories(self.root):
+                        pending |= list_entries(directory)
+
+                batch = {path for path in pending if self.include(path) or not os.path.lexists(path)}
+                if batch:
+                    yield batch
+        finally:
+            self.backend.close()
@@ -2,9 +2,10 @@
 // Prevents additional console window on Windows in release, DO NOT REMOVE!!
 #![cfg_attr(not(debug_assertions), windows_subsystem = "windows")]
 
-use std::process::Command;
+use std::process::{Child, ChildStdin, ChildStdout, Command, Stdio};
 use std::path::Path;
-use std::io::Write;
+use std::io::{BufRead, BufReader, Write};
+use std::sync::Mutex;
 use serde::{Deserialize, Serialize};
 use tauri::command;
 
@@ -90,31 +91,166 @@ struct ProgressUpdate {
     current_file: Option<String>,
 }
 
-#[command]
-async fn analyze_code(request: CodeAnalysisRequest) -> Result<CodeAnalysisResponse, String> {
-    let python_script = if cfg!(debug_assertions) {
-        "../backend/processor.py"
-    } else {
-        "./backend/processor.py"
-    };
+/// Long-lived `processor.py --input -` process. Documents are answered one at a time,
+/// so linter workers and sandbox runners stay warm between calls from the UI.
+struct ProcessorSession {
+    args: &'static [&'static str],
+    process: Mutex<Option<SessionProcess>>,
+}
 
-    let output = Command::new("python3")
-        .arg(python_script)
-        .arg(&request.code)
-        .arg(&request.filename)
-        .output()
-        .map_err(|e| format!("Failed to execute Python processor: {}", e))?;
+/// Session that analyses code from the editor and batch views
+struct AnalysisSession(ProcessorSession);
 
-    if !output.status.success() {
-        let error = String::from_utf8_lossy(&output.stderr);
-        return Err(format!("Python processor failed: {}", error));
+/// Session that executes code for the run button; the only one started with --allow-run
+struct SandboxSession(ProcessorSession);
+
+struct SessionProcess {
+    child: Child,
+    stdin: ChildStdin,
+    stdout: BufReader<ChildStdout>,
+}
+
+impl SessionProcess {
+    fn spawn(args: &[&str]) -> Result<Self, String> {
+        let python_script = if cfg!(debug_assertions) {
+            "../backend/processor.py"
+        } else {
+            "./backend/processor.py"
+        };
+
+        // stderr carries progress lines; inherit it so nobody has to drain the pipe
+        let mut child = Command::new("python3")
+            .arg(python_script)
+            .arg("--input")
+            .arg("-")
+            .arg("--framing")
+            .arg("ndjson")
+            .args(args)
+            .stdin(Stdio::piped())
+            .stdout(Stdio::piped())
+            .stderr(Stdio::inherit())
+            .spawn()
+            .map_err(|e| format!("Failed to execute Python processor: {}", e))?;
+        let stdin = child.stdin.take().ok_or("Failed to open processor stdin")?;
+        let stdout = child.stdout.take().ok_or("Failed to open processor stdout")?;
+        Ok(SessionProcess {
+            child,
+            stdin,
+            stdout: BufReader::new(stdout),
+        })
     }
 
-    let stdout = String::from_utf8_lossy(&output.stdout);
-    let result: CodeAnalysisResponse = serde_json::from_str(&stdout)
-        .map_err(|e| format!("Failed to parse Python response: {}", e))?;
+    fn send(&mut self, document: &serde_json::Value) -> Result<(), String> {
+        let mut line = serde_json::to_vec(document)
+            .map_err(|e| format!("Failed to encode document: {}", e))?;
+        line.push(b'\n');
+        self.stdin
+            .write_all(&line)
+            .and_then(|_| self.stdin.flush())
+            .map_err(|e| format!("Failed to write to stdin: {}", e))
+    }
 
-    Ok(result)
+    fn receive(&mut self) -> Result<serde_json::Value, String> {
+        let mut line = String::new();
+        loop {
+            line.clear();
+            let read = self
+                .stdout
+                .read_line(&mut line)
+                .map_err(|e| format!("Failed to read output: {}", e))?;
+            if read == 0 {
+                return Err("Python processor exited before answering".to_string());
+            }
+            if !line.trim().is_empty() {
+                break;
+            }
+        }
+        serde_json::from_str(&line).map_err(|e| format!("Failed to parse Python response: {}", e))
+    }
+}
+
+impl Drop for SessionProcess {
+    fn drop(&mut self) {
+        let _ = self.child.kill();
+        let _ = self.child.wait();
+    }
+}
+
+impl ProcessorSession {
+    fn new(args: &'static [&'static str]) -> Self {
+        ProcessorSession {
+            args,
+            process: Mutex::new(None),
+        }
+    }
+
+    /// Send one document and wait for its result, restarting the processor if it has exited
+    fn request(&self, document: serde_json::Value) -> Result<serde_json::Value, String> {
+        let mut process = self
+            .process
+            .lock()
+            .map_err(|_| "Processor session is unavailable".to_string())?;
+
+        // A failed write means the processor never saw the request, so resending is safe
+        let mut sent = Err("Failed to start Python processor".to_string());
+        for _ in 0..2 {
+            let exited = match process.as_mut() {
+                Some(running) => !matches!(running.child.try_wait(), Ok(None)),
+                None => true,
+            };
+            if exited {
+                *process = Some(SessionProcess::spawn(self.args)?);
+            }
+            sent = process.as_mut().unwrap().send(&document);
+            if sent.is_ok() {
+                break;
+            }
+            *process = None;
+        }
+        sent?;
+
+        // Once sent, a failure is reported rather than retried so nothing runs twice
+        let result = process.as_mut().unwrap().receive();
+        if result.is_err() {
+            *process = None;
+        }
+        result
+    }
+}
+
+/// Parse one processor result, turning an error frame into Err
+fn parse_analysis(output: serde_json::Value) -> Result<CodeAnalysisResponse, String> {
+    if let Some(error) = output.get("error").and_then(|e| e.as_str()) {
+        return Err(error.to_string());
+    }
+    serde_json::from_value(output).map_err(|e| format!("Failed to parse Python response: {}", e))
+}
+
+fn failed_analysis(filename: String, error: String) -> CodeAnalysisResponse {
+    CodeAnalysisResponse {
+        language: "unknown".to_string(),
+        filename,
+        static_analysis: serde_json::Value::Null,
+        ai_analysis: serde_json::Value::Null,
+        response: format!("Analysis failed: {}", error),
+        lines: 0,
+        size: 0,
+        success: false,
+    }
+}
+
+#[command]
+async fn analyze_code(
+    request: CodeAnalysisRequest,
+    session: tauri::State<'_, AnalysisSession>,
+) -> Result<CodeAnalysisResponse, String> {
+    let document = serde_json::json!({
+        "filename": request.filename,
+        "content": request.code,
+    });
+
+    let result = session.0.request(document)?;
+    parse_analysis(result).map_err(|e| format!("Python processor failed: {}", e))
 }
 
 #[command]
@@ -149,16 +285,23 @@ async fn analyze_directory(request: DirectoryAnalysisRequest) -> Result<Director
 }
 
 #[command]
-async fn analyze_multiple_files(request: BatchAnalysisRequest) -> Result<BatchAnalysisResponse, String> {
+async fn analyze_multiple_files(
+    request: BatchAnalysisRequest,
+    session: tauri::State<'_, AnalysisSession>,
+) -> Result<BatchAnalysisResponse, String> {
     let mut results = Vec::new();
     let mut successful = 0;
     let total = request.files.len();
 
-    for file in request.files {
-        match analyze_code(CodeAnalysisRequest {
-            code: file.content,
-            filename: file.name.clone(),
-        }).await {
+    // Files go through the warm session one at a time; a failure only affects that file
+    for file in request.files.into_iter() {
+        let document = serde_json::json!({
+            "filename": file.name,
+            "content": file.content,
+        });
+        let parsed = session.0.request(document).and_then(parse_analysis);
+
+        match parsed {
             Ok(mut result) => {
                 if let Some(path) = file.path {
                     // Add path information to result if available
@@ -169,18 +312,7 @@ async fn analyze_multiple_files(request: BatchAnalysisRequest) -> Result<BatchAn
                 }
                 results.push(result);
             }
-            Err(e) => {
-                results.push(CodeAnalysisResponse {
-                    language: "unknown".to_string(),
-                    filename: file.name,
-                    static_analysis: serde_json::Value::Null,
-                    ai_analysis: serde_json::Value::Null,
-                    response: format!("Analysis failed: {}", e),
-                    lines: 0,
-                    size: 0,
-                    success: false,
-                });
-            }
+            Err(e) => results.push(failed_analysis(file.name, e)),
         }
     }
 
@@ -203,6 +335,7 @@ async fn analyze_multiple_files(request: BatchAnalysisRequest) -> Result<BatchAn
 async fn analyze_code_with_progress(
     request: CodeAnalysisRequest,
     progress_callback: tauri::State<'_, ProgressCallback>,
+    session: tauri::State<'_, AnalysisSession>,
 ) -> Result<CodeAnalysisResponse, String> {
     // Emit progress updates
     progress_callback.emit(ProgressUpdate {
@@ -232,7 +365,7 @@ async fn analyze_code_with_progress(
     });
 
     // Perform actual analysis
-    let result = analyze_code(request).await?;
+    let result = analyze_code(request, session).await?;
 
     progress_callback.emit(ProgressUpdate {
         step: "complete".to_string(),
@@ -447,32 +580,31 @@ async fn ask_question(question: String) -> Result<String, String> {
 }
 
 #[command]
-async fn run_code_sandbox(request: SandboxRequest) -> Result<SandboxResponse, String> {
-    let python_script = if cfg!(debug_assertions) {
-        "../backend/processor.py"
-    } else {
-        "./backend/processor.py"
+async fn run_code_sandbox(
+    request: SandboxRequest,
+    session: tauri::State<'_, SandboxSession>,
+) -> Result<SandboxResponse, String> {
+    let document = serde_json::json!({
+        "action": "run",
+        "filename": request.filename,
+        "content": request.code,
+        "project_dir": request.project_dir,
+    });
+    let result = session.0.request(document)?;
+
+    let field = |key: &str| {
+        result
+            .get(key)
+            .and_then(|v| v.as_str())
+            .unwrap_or_default()
+            .to_string()
+    };
+    let stdout = field("stdout");
+    let stderr = match result.get("error").and_then(|e| e.as_str()) {
+        Some(error) => error.to_string(),
+        None => field("stderr"),
     };
-    let mut cmd = Command::new("python3");
-    cmd.arg(python_script)
-        .arg("--run")
-        .arg(&request.filename)
-        .arg("--project_dir")
-        .arg(&request.project_dir);
-    cmd.stdin(std::process::Stdio::piped());
-    let mut child = cmd.spawn().map_err(|e| format!("Failed to spawn: {}", e))?;
-    child
-        .stdin
-        .as_mut()
-        .unwrap()
-        .write_all(request.code.as_bytes())
-        .map_err(|e| format!("Failed to write to stdin: {}", e))?;
-    let output = child
-        .wait_with_output()
-        .map_err(|e| format!("Failed to read output: {}", e))?;
-    let stdout = String::from_utf8_lossy(&output.stdout).into_owned();
-    let stderr = String::from_utf8_lossy(&output.stderr).into_owned();
-    let status = if output.status.success() {
+    let status = if result.get("returncode").and_then(|c| c.as_i64()) == Some(0) {
         "success"
     } else {
         "error"
@@ -486,6 +618,8 @@ fn main() {
         .plugin(tauri_plugin_dialog::init())
         .plugin(tauri_plugin_fs::init())
         .manage(ProgressCallback)
+        .manage(AnalysisSession(ProcessorSession::new(&[])))
+        .manage(SandboxSession(ProcessorSession::new(&["--allow-run"])))
         .invoke_handler(tauri::generate_handler![
             analyze_code,
             analyze_directory,
@@ -0,0 +1,143 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+BACKEND = os.path.join(os.path.dirname(__file__), '..', 'backend')
+sys.path.insert(0, BACKEND)
+
+from processor import AnalysisCancelled, CancellationToken, EnhancedCodeProcessor, run_process  # noqa: E402
+
+SLEEP = [sys.executable, '-c', 'import time; time.sleep(30)']
+
+
+def test_timeout_is_capped_by_deadline():
+    token = CancellationToken(timeout=2)
+    assert 1.5 < token.timeout(30) <= 2
+    assert token.timeout(0.5) == 0.5
+    assert CancellationToken().timeout(30) == 30
+    assert CancellationToken().timeout(None) is None
+
+
+def test_deadline_sets_reason():
+    token = CancellationToken(timeout=0.05)
+    assert not token.cancelled
+    time.sleep(0.1)
+    assert token.cancelled
+    assert token.reason == 'Deadline exceeded'
+    with pytest.raises(AnalysisCancelled, match='Deadline exceeded'):
+        token.raise_if_cancelled()
+
+
+def test_cancel_runs_callbacks_once_registered():
+    token = CancellationToken()
+    calls = []
+    remove = token.on_cancel(lambda: calls.append('a'))
+    token.on_cancel(lambda: calls.append('b'))
+    remove()
+    token.cancel('Stop')
+    assert calls == ['b']
+    assert token.reason == 'Stop'
+    # Registering after cancellation fires immediately
+    token.on_cancel(lambda: calls.append('c'))
+    assert calls == ['b', 'c']
+
+
+def test_cancel_is_reentrant():
+    # cancel() from a signal handler may interrupt on_cancel() holding the lock
+    token = CancellationToken()
+    with token._lock:
+        token.cancel('Interrupted')
+    assert token.cancelled
+
+
+def test_run_process_completes():
+    result = run_process([sys.executable, '-c', 'print("ok")'], 10, CancellationToken(), text=True)
+    assert result.stdout == 'ok\n'
+
+
+def test_run_process_timeout():
+    started = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_process(SLEEP, 0.3, CancellationToken())
+    assert time.monotonic() - started < 5
+
+
+def test_run_process_deadline_cancels():
+    started = time.monotonic()
+    with pytest.raises(AnalysisCancelled, match='Deadline exceeded'):
+        run_process(SLEEP, 30, CancellationToken(timeout=0.3))
+    assert time.monotonic() - started < 5
+
+
+def test_cancel_kills_running_process():
+    token = CancellationToken()
+    threading.Timer(0.3, token.cancel, args=('Stop',)).start()
+    started = time.monotonic()
+    with pytest.raises(AnalysisCancelled, match='Stop'):
+        run_process(SLEEP, 30, token)
+    assert time.monotonic() - started < 5
+
+
+def test_analyze_directory_marks_skipped_files(tmp_path, monkeypatch):
+    for name in ('a.py', 'b.py', 'c.py'):
+        (tmp_path / name).write_text('x = 1\n')
+    processor = EnhancedCodeProcessor()
+    token = CancellationToken()
+
+    def analyze_file(file_info, cancel_token=None):
+        # Cancel while the first file is analysed
+        cancel_token.cancel('Interrupted')
+        return {'filename': file_info['filename'], 'relative_path': file_info['relative_path'], 'success': True}
+
+    monkeypatch.setattr(processor, 'analyze_file', analyze_file)
+    result = processor.analyze_directory(str(tmp_path), token)
+    assert result['incomplete'] is True
+    assert result['incomplete_reason'] == 'Interrupted'
+    assert [r['relative_path'] for r in result['results']] == ['a.py']
+    assert sorted(result['skipped_files']) == ['b.py', 'c.py']
+
+
+def test_analyze_documents_marks_cancelled_document(monkeypatch):
+    processor = EnhancedCodeProcessor()
+    token = CancellationToken()
+
+    def process_code(code, filename, cancel_token=None):
+        cancel_token.cancel('Interrupted')
+        cancel_token.raise_if_cancelled()
+
+    monkeypatch.setattr(processor, 'process_code_with_progress', process_code)
+    documents = iter([{'filename': 'a.py', 'content': ''}, {'filename': 'b.py', 'content': ''}])
+    results = list(processor.analyze_documents(documents, token))
+    assert results == [{'filename': 'a.py', 'error': 'Interrupted', 'success': False, 'incomplete': True}]
+
+
+def test_run_documents_require_allow_run():
+    processor = EnhancedCodeProcessor()
+    documents = iter([{'action': 'run', 'filename': 'a.py', 'content': 'print(1)'}])
+    (result,) = processor.analyze_documents(documents)
+    assert result['success'] is False
+    assert '--allow-run' in result['error']
+
+
+@pytest.mark.parametrize('signum', [signal.SIGTERM, signal.SIGINT])
+def test_idle_input_session_exits_on_signal(signum):
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND, 'processor.py'), '--input', '-'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        # One answered document shows the handlers are installed and the session is idle
+        process.stdin.write(b'{"action": "run", "filename": "a.py"}\n')
+        process.stdin.flush()
+        assert b'--allow-run' in process.stdout.readline()
+        time.sleep(0.2)
+        process.send_signal(signum)
+        assert process.wait(timeout=10) == 128 + signum
+    finally:
+        process.kill()
+        process.wait()
@@ -0,0 +1,91 @@
+import io
+import json
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from processor import read_documents, write_frame  # noqa: E402
+from records import IssueTable, decode_compact  # noqa: E402
+
+HEADER = struct.Struct('<I')
+
+
+def length_frames(*payloads):
+    return b''.join(HEADER.pack(len(p)) + p for p in payloads)
+
+
+def test_ndjson_documents_skip_blank_lines():
+    stream = io.BytesIO(b'{"filename": "a.py", "content": "x = 1"}\n\n{"filename": "b.js", "content": ""}\n')
+    assert list(read_documents(stream)) == [
+        {'filename': 'a.py', 'content': 'x = 1'},
+        {'filename': 'b.js', 'content': ''},
+    ]
+
+
+def test_ndjson_last_line_without_newline():
+    stream = io.BytesIO(b'{"filename": "a.py", "content": "x"}')
+    assert list(read_documents(stream)) == [{'filename': 'a.py', 'content': 'x'}]
+
+
+def test_invalid_frames_become_error_documents():
+    stream = io.BytesIO(b'not json\n[1, 2]\n{"filename": "ok.py"}\n')
+    documents = list(read_documents(stream))
+    assert documents[0]['error'].startswith('Invalid input frame')
+    assert 'JSON object' in documents[1]['error']
+    assert documents[2] == {'filename': 'ok.py'}
+
+
+def test_length_framing():
+    content = 'line one\nline two\n'
+    stream = io.BytesIO(length_frames(
+        json.dumps({'filename': 'a.py', 'content': content}).encode(),
+        b'{"filename": "b.py", "content": ""}',
+    ))
+    assert list(read_documents(stream, 'length')) == [
+        {'filename': 'a.py', 'content': content},
+        {'filename': 'b.py', 'content': ''},
+    ]
+
+
+def test_truncated_length_header():
+    stream = io.BytesIO(length_frames(b'{}') + b'\x05\x00')
+    documents = read_documents(stream, 'length')
+    assert next(documents) == {}
+    with pytest.raises(ValueError, match='header'):
+        next(documents)
+
+
+def test_truncated_length_payload():
+    stream = io.BytesIO(HEADER.pack(100) + b'{"filename": "a.py"}')
+    with pytest.raises(ValueError, match='payload'):
+        list(read_documents(stream, 'length'))
+
+
+def test_write_frame_ndjson():
+    out = io.BytesIO()
+    write_frame(out, {'filename': 'a.py', 'success': True})
+    write_frame(out, {'filename': 'b.py', 'success': False})
+    lines = out.getvalue().splitlines()
+    assert [json.loads(line)['filename'] for line in lines] == ['a.py', 'b.py']
+
+
+def test_write_frame_length_round_trip():
+    issues = IssueTable()
+    issues.append(3, 0, 'warning', 'Unused import os', 'W0611')
+    result = {'filename': 'a.py', 'static_analysis': {'issues': issues, 'status': 'success'}}
+    expected = {'filename': 'a.py', 'static_analysis': {'issues': issues.to_dicts(), 'status': 'success'}}
+
+    out = io.BytesIO()
+    write_frame(out, result, 'length')
+    write_frame(out, result, 'length', 'compact')
+    out.seek(0)
+
+    size = HEADER.unpack(out.read(HEADER.size))[0]
+    assert json.loads(out.read(size)) == expected
+    size = HEADER.unpack(out.read(HEADER.size))[0]
+    assert decode_compact(out.read(size)) == expected
+    assert out.read() == b''
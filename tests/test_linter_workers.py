@@ -0,0 +1,105 @@
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from linter_workers import LinterWorker, WorkerCrashed, WorkerError, WorkerTimeout  # noqa: E402
+
+# Answers {"id", "path"} requests like the real workers; the path picks the behaviour
+FAKE_WORKER = textwrap.dedent('''
+    import json, os, sys, time
+    for line in sys.stdin:
+        request = json.loads(line)
+        path = request["path"]
+        if path == "crash":
+            sys.exit(3)
+        if path == "slow":
+            time.sleep(30)
+        if path == "bad":
+            response = {"id": request["id"], "error": "cannot lint"}
+        else:
+            response = {"id": request["id"], "result": {"path": path, "pid": os.getpid()}}
+        print(json.dumps(response), flush=True)
+''')
+
+
+@pytest.fixture
+def make_worker(tmp_path):
+    script = tmp_path / 'fake_worker.py'
+    script.write_text(FAKE_WORKER)
+    workers = []
+
+    def make(**kwargs):
+        worker = LinterWorker('fake', [sys.executable, str(script)], **kwargs)
+        workers.append(worker)
+        return worker
+
+    yield make
+    for worker in workers:
+        worker.stop()
+
+
+def test_worker_stays_up_between_requests(make_worker):
+    worker = make_worker()
+    first = worker.request({'path': 'a.py'})['result']
+    second = worker.request({'path': 'b.py'})['result']
+    assert first['path'] == 'a.py' and second['path'] == 'b.py'
+    assert first['pid'] == second['pid']
+
+
+def test_error_response_raises_without_killing_worker(make_worker):
+    worker = make_worker()
+    pid = worker.request({'path': 'a.py'})['result']['pid']
+    with pytest.raises(WorkerError, match='cannot lint'):
+        worker.request({'path': 'bad'})
+    assert worker.request({'path': 'a.py'})['result']['pid'] == pid
+
+
+def test_timeout_kills_worker(make_worker):
+    worker = make_worker(timeout=0.5)
+    pid = worker.request({'path': 'a.py'})['result']['pid']
+    with pytest.raises(WorkerTimeout):
+        worker.request({'path': 'slow'})
+    assert worker.process is None
+    assert worker.request({'path': 'a.py'})['result']['pid'] != pid
+
+
+def test_restart_after_crash(make_worker):
+    worker = make_worker()
+    pid = worker.request({'path': 'a.py'})['result']['pid']
+    worker.process.kill()
+    worker.process.wait()
+    # The dead worker is replaced transparently
+    assert worker.request({'path': 'a.py'})['result']['pid'] != pid
+    assert not worker.disabled
+
+
+def test_disabled_after_max_failures(make_worker):
+    worker = make_worker(max_failures=3)
+    with pytest.raises(WorkerCrashed):
+        worker.request({'path': 'crash'})
+    assert not worker.disabled
+    with pytest.raises(WorkerCrashed):
+        worker.request({'path': 'crash'})
+    assert worker.disabled
+    with pytest.raises(WorkerError, match='disabled'):
+        worker.request({'path': 'a.py'})
+
+
+def test_success_resets_failure_count(make_worker):
+    worker = make_worker(max_failures=3)
+    with pytest.raises(WorkerCrashed):
+        worker.request({'path': 'crash'})
+    worker.request({'path': 'a.py'})
+    with pytest.raises(WorkerCrashed):
+        worker.request({'path': 'crash'})
+    assert not worker.disabled
+
+
+def test_recycled_after_max_requests(make_worker):
+    worker = make_worker(max_requests=2)
+    pids = [worker.request({'path': 'a.py'})['result']['pid'] for _ in range(3)]
+    assert pids[0] == pids[1] != pids[2]
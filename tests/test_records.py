@@ -0,0 +1,77 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from records import IssueTable, decode_compact, encode_compact, to_jsonable  # noqa: E402
+
+FILE_RESULT = {
+    'filename': 'app.py',
+    'language': 'python',
+    'success': True,
+    'static_analysis': {
+        'issues': [
+            {'line': 3, 'column': 0, 'severity': 'warning', 'message': 'Unused import os', 'rule': 'W0611'},
+            {'line': 9, 'column': 4, 'severity': 'error', 'message': 'Undefined variable', 'rule': 'E0602'},
+        ],
+        'tool': 'pylint',
+        'status': 'success',
+    },
+    'ai_analysis': {'success': True, 'response': 'Looks fine', 'model': 'codellama'},
+    'response': 'Looks fine',
+    'lines': 12,
+    'size': 240,
+    'relative_path': 'src/app.py',
+}
+
+ERROR_RESULT = {'filename': 'broken.py', 'success': False, 'error': 'Could not read file'}
+
+RUN_RESULT = {'filename': 'snippet.py', 'stdout': 'hi\n', 'stderr': '', 'timeout': False}
+
+INCOMPLETE_RESULT = {'filename': 'late.py', 'success': False, 'incomplete': True, 'error': 'Deadline exceeded'}
+
+DIRECTORY_RESULT = {
+    'success': True,
+    'type': 'directory',
+    'directory': '/tmp/project',
+    'results': [FILE_RESULT, ERROR_RESULT, INCOMPLETE_RESULT],
+    'project_analysis': {'total_files': 3, 'languages': {'python': 3}, 'issues_found': 2},
+    'incomplete': False,
+}
+
+
+def test_compact_round_trip_keeps_exact_keys():
+    for result in (FILE_RESULT, ERROR_RESULT, RUN_RESULT, INCOMPLETE_RESULT, DIRECTORY_RESULT):
+        assert decode_compact(encode_compact(result)) == result
+
+
+def test_compact_round_trip_batch():
+    batch = [FILE_RESULT, ERROR_RESULT, RUN_RESULT]
+    assert decode_compact(encode_compact(batch)) == batch
+
+
+def test_irregular_issues_are_kept_as_is():
+    result = dict(FILE_RESULT, static_analysis={
+        'issues': [{'line': None, 'message': 'No column or rule', 'extra': 1}],
+        'tool': 'eslint',
+    })
+    assert decode_compact(encode_compact(result)) == result
+
+
+def test_issue_table_keeps_missing_fields():
+    issues = [
+        {'line': None, 'column': None, 'severity': 'error', 'message': 'Parsing error', 'rule': None},
+        {'line': 4, 'column': 2, 'severity': 'warning', 'message': 'Unused', 'rule': 'no-unused-vars'},
+    ]
+    table = IssueTable.from_dicts(issues)
+    assert table.to_dicts() == issues
+    assert decode_compact(encode_compact({'issues': table})) == {'issues': issues}
+
+
+def test_issue_table_serializes_like_dicts():
+    table = IssueTable.from_dicts(FILE_RESULT['static_analysis']['issues'])
+    result = dict(FILE_RESULT, static_analysis=dict(FILE_RESULT['static_analysis'], issues=table))
+    assert json.loads(json.dumps(result, default=to_jsonable)) == FILE_RESULT
+    assert decode_compact(encode_compact(result)) == FILE_RESULT
+    assert isinstance(decode_compact(encode_compact(result), as_tables=True)['static_analysis']['issues'], IssueTable)
@@ -0,0 +1,69 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sandbox_pool import SandboxPool  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason='the fork server needs os.fork')
+
+
+@pytest.fixture
+def pool():
+    pool = SandboxPool()
+    yield pool
+    pool.shutdown()
+
+
+def run_python(pool, directory, code, timeout=5, on_output=None):
+    (directory / 'snippet.py').write_text(code)
+    return pool.run('python', str(directory), 'snippet.py', timeout, on_output)
+
+
+def test_python_run_streams_output(pool, tmp_path):
+    chunks = []
+    result = run_python(pool, tmp_path, 'import sys\nprint("hello")\nprint("oops", file=sys.stderr)\n',
+                        on_output=lambda stream, text: chunks.append(stream))
+    assert result == {'stdout': 'hello\n', 'stderr': 'oops\n', 'timeout': False, 'returncode': 0}
+    assert set(chunks) == {'stdout', 'stderr'}
+
+
+def test_python_runs_in_snippet_directory(pool, tmp_path):
+    (tmp_path / 'helper.py').write_text('VALUE = 42\n')
+    result = run_python(pool, tmp_path, 'import os, helper\nprint(helper.VALUE, os.getcwd())\n')
+    assert result['stdout'] == f'42 {tmp_path}\n'
+
+
+def test_python_exit_code_and_traceback(pool, tmp_path):
+    assert run_python(pool, tmp_path, 'raise SystemExit(3)\n')['returncode'] == 3
+    result = run_python(pool, tmp_path, 'def f():\n    raise ValueError("bad")\nf()\n')
+    assert result['returncode'] == 1
+    assert 'ValueError: bad' in result['stderr']
+    assert 'sandbox_pool' not in result['stderr']
+
+
+def test_python_timeout_kills_snippet(pool, tmp_path):
+    result = run_python(pool, tmp_path, 'print("started", flush=True)\nwhile True:\n    pass\n', timeout=0.5)
+    assert result['timeout'] is True
+    assert result['stdout'] == 'started\n'
+    # The fork server survives and serves the next snippet
+    assert run_python(pool, tmp_path, 'print("next")\n')['stdout'] == 'next\n'
+
+
+def test_server_death_after_accept_is_not_rerun(pool, tmp_path):
+    counter = tmp_path / 'runs.txt'
+    code = (
+        'import os, signal\n'
+        f'open({str(counter)!r}, "a").write("run\\n")\n'
+        'os.kill(os.getppid(), signal.SIGKILL)\n'
+    )
+    result = run_python(pool, tmp_path, code)
+    assert result['returncode'] is None
+    assert 'runner exited' in result['stderr']
+    assert counter.read_text() == 'run\n'
+
+    # Not blacklisted: the server is restarted for the next snippet
+    assert pool.supports('python')
+    assert run_python(pool, tmp_path, 'print("again")\n')['stdout'] == 'again\n'
@@ -0,0 +1,123 @@
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from watcher import DirectoryWatcher, InotifyBackend  # noqa: E402
+
+
+def inotify_available(path):
+    try:
+        InotifyBackend(str(path)).close()
+        return True
+    except OSError:
+        return False
+
+
+class Batches:
+    """Runs DirectoryWatcher.batches() in a thread and collects what it yields"""
+
+    def __init__(self, watcher):
+        self.stop = threading.Event()
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, args=(watcher,), daemon=True)
+        self.thread.start()
+
+    def _run(self, watcher):
+        for batch in watcher.batches(self.stop):
+            self.queue.put(batch)
+
+    def next(self, timeout=5.0):
+        return self.queue.get(timeout=timeout)
+
+    def assert_quiet(self, wait=1.0):
+        with pytest.raises(queue.Empty):
+            self.queue.get(timeout=wait)
+
+    def close(self):
+        self.stop.set()
+        self.thread.join(timeout=5)
+
+
+@pytest.fixture
+def watch(tmp_path):
+    started = []
+
+    def start(polling=True, include=None, debounce=0.3):
+        watcher = DirectoryWatcher(str(tmp_path), debounce=debounce, include=include, polling=polling)
+        if polling:
+            watcher.backend.interval = 0.05
+        batches = Batches(watcher)
+        started.append(batches)
+        return batches
+
+    yield start
+    for batches in started:
+        batches.close()
+
+
+def test_polling_coalesces_a_burst(tmp_path, watch):
+    target = tmp_path / 'a.py'
+    target.write_text('x = 0\n')
+    batches = watch()
+    for i in range(5):
+        target.write_text(f'x = {i + 1}\n' * (i + 1))
+        time.sleep(0.05)
+    assert batches.next() == {str(target)}
+    batches.assert_quiet()
+
+
+def test_polling_debounce_splits_separate_edits(tmp_path, watch):
+    first, second = tmp_path / 'a.py', tmp_path / 'b.py'
+    batches = watch(debounce=0.2)
+    first.write_text('a = 1\n')
+    assert batches.next() == {str(first)}
+    second.write_text('b = 1\n')
+    assert batches.next() == {str(second)}
+
+
+def test_polling_include_filter(tmp_path, watch):
+    batches = watch(include=lambda path: path.endswith('.py'))
+    (tmp_path / 'notes.txt').write_text('ignored\n')
+    batches.assert_quiet()
+    (tmp_path / 'a.py').write_text('x = 1\n')
+    assert batches.next() == {str(tmp_path / 'a.py')}
+
+
+def test_polling_deleted_directory_bypasses_include(tmp_path, watch):
+    package = tmp_path / 'pkg'
+    package.mkdir()
+    (package / 'mod.py').write_text('x = 1\n')
+    (package / 'data.bin').write_bytes(b'\0')
+    # include rejects everything: only removals may get through
+    batches = watch(include=lambda path: False)
+    shutil.rmtree(package)
+    assert batches.next() == {str(package / 'mod.py'), str(package / 'data.bin')}
+
+
+def test_inotify_moved_directory(tmp_path, tmp_path_factory, watch):
+    if not inotify_available(tmp_path):
+        pytest.skip('inotify is not available')
+    package = tmp_path / 'pkg'
+    (package / 'sub').mkdir(parents=True)
+    (package / 'sub' / 'mod.py').write_text('x = 1\n')
+    outside = tmp_path_factory.mktemp('outside') / 'pkg'
+
+    batches = watch(polling=False, include=lambda path: path.endswith('.py'))
+    time.sleep(0.2)
+    os.rename(package, outside)
+    assert batches.next() == {str(package)}
+
+    # The moved tree is no longer watched under its old path
+    (outside / 'sub' / 'mod.py').write_text('x = 2\n')
+    batches.assert_quiet()
+
+    # Moving it back picks up its files again
+    os.rename(outside, package)
+    assert str(package / 'sub' / 'mod.py') in batches.next()